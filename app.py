@@ -7,6 +7,8 @@ import sqlite3
 from collections import defaultdict
 from datetime import date, datetime, timedelta
 from functools import wraps
+from itertools import groupby
+from operator import itemgetter
 from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
 try:
@@ -40,6 +42,7 @@ from src.db import (
     get_staff_by_id,
     get_unit_by_id,
     list_units,
+    iter_assignment_history,
     list_assignment_history,
     list_clinic_seniority_rules,
     list_clinics,
@@ -48,6 +51,7 @@ from src.db import (
     list_leave_requests,
     list_staff,
     replace_assignment_history,
+    replace_assignment_history_bulk,
     reorder_clinic,
     update_clinic_required_assistants,
     update_staff_preferences,
@@ -73,6 +77,7 @@ MONTH_OPTIONS = [
     (11, "Kasım"),
     (12, "Aralık"),
 ]
+MONTH_LABELS = {value: label for value, label in MONTH_OPTIONS}
 DEFAULT_YEAR_SPAN = 3
 WEEKEND_HISTORY_MONTHS = 3
 
@@ -80,6 +85,12 @@ PLAN_TYPE_OPTIONS = [
     ("clinic", "Klinik Mesai Planı Oluştur"),
     ("nobet", "Nöbet Planı Oluştur"),
 ]
+PLAN_TYPE_LABELS = {value: label for value, label in PLAN_TYPE_OPTIONS}
+# Slot identifier prefix stored for each plan type and whether its rows carry a clinic id.
+PLAN_TYPE_SLOT_SPECS = {
+    "clinic": ("clinic_", True),
+    "nobet": ("duty_", False),
+}
 
 CLINIC_ROTATION_OPTIONS = [
     ("daily", "Günlük"),
@@ -580,6 +591,14 @@ def login_required(view):
 
 
 def _safe_int(value):
+    if value is None:
+        return None
+    if type(value) is int:
+        return value
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
     try:
         return int(value)
     except (TypeError, ValueError):
@@ -793,7 +812,7 @@ def compute_plan(unit_id: int, year=None, month=None, plan_type: str = "clinic",
             continue
         clinic_rotation_periods[clinic_id_int] = clinic.get("rotation_period", DEFAULT_ROTATION_PERIOD)
 
-    clinic_rule_rows = [dict(row) for row in list(list_clinic_seniority_rules(unit_id))]
+    clinic_rule_rows = [dict(row) for row in list_clinic_seniority_rules(unit_id)]
     clinic_rule_map: Dict[int, Dict[str, int]] = defaultdict(dict)
     for rule in clinic_rule_rows:
         clinic_id_raw = rule.get("clinic_id")
@@ -813,10 +832,9 @@ def compute_plan(unit_id: int, year=None, month=None, plan_type: str = "clinic",
     if normalized_plan != "nobet":
         previous_year, previous_month = _previous_month(selected_year, selected_month)
         previous_period = _plan_period(previous_year, previous_month)
-        history_rows = [dict(row) for row in list(list_assignment_history(unit_id, previous_period))]
-        for history in history_rows:
-            clinic_id_raw = history.get("clinic_id")
-            staff_id_raw = history.get("staff_id")
+        for _row_id, staff_id_raw, clinic_id_raw, *_rest in iter_assignment_history(
+            unit_id, previous_period, has_clinic=True
+        ):
             try:
                 clinic_id_int = int(clinic_id_raw)
                 staff_id_int = int(staff_id_raw)
@@ -837,11 +855,9 @@ def compute_plan(unit_id: int, year=None, month=None, plan_type: str = "clinic",
             if history_year < 1:
                 break
             period = _plan_period(history_year, history_month)
-            for history in list_assignment_history(unit_id, period):
-                day_type = (history.get("day_type") or "").strip().lower()
-                if day_type != "weekend":
-                    continue
-                staff_id_raw = history.get("staff_id")
+            for _row_id, staff_id_raw, *_rest in iter_assignment_history(
+                unit_id, period, day_type="weekend"
+            ):
                 try:
                     staff_id_int = int(staff_id_raw)
                 except (TypeError, ValueError):
@@ -850,7 +866,7 @@ def compute_plan(unit_id: int, year=None, month=None, plan_type: str = "clinic",
 
     weekend_history_counts = dict(weekend_history_counts)
 
-    leave_rows = [dict(row) for row in list(list_leave_requests(unit_id))]
+    leave_rows = [dict(row) for row in list_leave_requests(unit_id)]
     leave_requests_map: Dict[int, List[tuple[date, date]]] = defaultdict(list)
     for leave in leave_rows:
         staff_id_raw = leave.get("staff_id")
@@ -871,7 +887,7 @@ def compute_plan(unit_id: int, year=None, month=None, plan_type: str = "clinic",
 
     duty_rows_source = duty_types if duty_types is not None else list(list_duty_types(unit_id))
     duty_type_records = [dict(row) for row in duty_rows_source]
-    duty_rule_rows = [dict(row) for row in list(list_duty_seniority_rules(unit_id))]
+    duty_rule_rows = [dict(row) for row in list_duty_seniority_rules(unit_id)]
     duty_rule_map: Dict[int, Dict[str, int]] = defaultdict(dict)
     for rule in duty_rule_rows:
         duty_id_raw = rule.get("duty_type_id")
@@ -1715,13 +1731,13 @@ def planla():
     approval_error = request.args.get("approval_error")
 
     requested_plan_type = (request.args.get("plan_type") or "clinic").strip().lower()
-    selected_plan_type = requested_plan_type if requested_plan_type in {option[0] for option in PLAN_TYPE_OPTIONS} else "clinic"
+    selected_plan_type = requested_plan_type if requested_plan_type in PLAN_TYPE_LABELS else "clinic"
 
-    staff_rows_for_plan = [dict(row) for row in list(list_staff(unit_id))]
+    staff_rows_for_plan = [dict(row) for row in list_staff(unit_id)]
     staff_name_map_for_plan = {row["id"]: row.get("name") for row in staff_rows_for_plan}
 
     clinic_records = []
-    for row in list(list_clinics(unit_id)):
+    for row in list_clinics(unit_id):
         row_dict = dict(row)
         responsible_id = row_dict.get("sorumlu_uzman_id")
         row_dict["responsible_name"] = (
@@ -1729,7 +1745,7 @@ def planla():
         )
         clinic_records.append(row_dict)
 
-    duty_type_records = [dict(row) for row in list(list_duty_types(unit_id))]
+    duty_type_records = [dict(row) for row in list_duty_types(unit_id)]
 
     result, error_message, error_status = compute_plan(
         unit_id=unit_id,
@@ -1758,9 +1774,8 @@ def planla():
         month=selected_month,
         plan_type=selected_plan_type,
     )
-    month_label = next((label for value, label in MONTH_OPTIONS if value == selected_month), str(selected_month))
-    plan_type_labels = {value: label for value, label in PLAN_TYPE_OPTIONS}
-    plan_type_label = plan_type_labels.get(selected_plan_type, "Klinik Mesai Planı Oluştur")
+    month_label = MONTH_LABELS.get(selected_month, str(selected_month))
+    plan_type_label = PLAN_TYPE_LABELS.get(selected_plan_type, "Klinik Mesai Planı Oluştur")
 
     return render_template(
         "planla.html",
@@ -1788,24 +1803,24 @@ def planla():
 def plan_kayitlari():
     unit_id = _require_unit_id()
 
-    staff_rows = [dict(row) for row in list(list_staff(unit_id))]
+    staff_rows = [dict(row) for row in list_staff(unit_id)]
     staff_map = {row["id"]: row for row in staff_rows}
-    clinic_rows = [dict(row) for row in list(list_clinics(unit_id))]
+    clinic_rows = [dict(row) for row in list_clinics(unit_id)]
     clinic_map = {row["id"]: row.get("name") for row in clinic_rows}
 
-    history_rows_all = [dict(row) for row in list(list_assignment_history(unit_id))]
-    month_label_map = {value: label for value, label in MONTH_OPTIONS}
-
     def format_period_label(period_value: str) -> str:
         try:
             year_part, month_part = period_value.split("-", 1)
             month_int = int(month_part)
-            month_label = month_label_map.get(month_int, month_part)
+            month_label = MONTH_LABELS.get(month_int, month_part)
             return f"{_(month_label)} {year_part}"
         except Exception:
             return period_value
 
-    available_periods = sorted({row.get("plan_month_year") for row in history_rows_all if row.get("plan_month_year")})
+    # Only the distinct periods are needed, so stream the history instead of materializing it.
+    available_periods = sorted(
+        {period for _id, _staff, _clinic, _date, period, _day in iter_assignment_history(unit_id) if period}
+    )
     period_options = [{"value": period, "label": format_period_label(period)} for period in available_periods]
 
     allowed_plan_types = {"clinic", "nobet"}
@@ -1833,36 +1848,38 @@ def plan_kayitlari():
         error_param = None
 
         if action == "delete" and target_period:
-            existing_rows = [dict(row) for row in list(list_assignment_history(unit_id, target_period))]
             preserved: List[Tuple[int, Optional[int], str, Optional[str]]] = []
             if target_type == "clinic":
-                for row in existing_rows:
-                    clinic_id_val = _safe_int(row.get("clinic_id"))
-                    staff_id = _safe_int(row.get("staff_id"))
+                for _row_id, staff_id_raw, clinic_id_raw, assignment_date, _period, day_type in (
+                    iter_assignment_history(unit_id, target_period, has_clinic=True)
+                ):
+                    clinic_id_val = _safe_int(clinic_id_raw)
+                    staff_id = _safe_int(staff_id_raw)
                     if clinic_id_val is None or staff_id is None:
                         continue
                     preserved.append(
                         (
                             staff_id,
                             clinic_id_val,
-                            row.get("assignment_date"),
-                            (row.get("day_type") or "weekday"),
+                            assignment_date,
+                            (day_type or "weekday"),
                         )
                     )
                 replace_assignment_history(unit_id, target_period, preserved)
                 message_param = _("Klinik plan kaydı silindi.")
             elif target_type == "nobet":
-                for row in existing_rows:
-                    clinic_id_val = _safe_int(row.get("clinic_id"))
-                    staff_id = _safe_int(row.get("staff_id"))
-                    if clinic_id_val is not None or staff_id is None:
+                for _row_id, staff_id_raw, _clinic_id, assignment_date, _period, day_type in (
+                    iter_assignment_history(unit_id, target_period, has_clinic=False)
+                ):
+                    staff_id = _safe_int(staff_id_raw)
+                    if staff_id is None:
                         continue
                     preserved.append(
                         (
                             staff_id,
                             None,
-                            row.get("assignment_date"),
-                            (row.get("day_type") or "weekday"),
+                            assignment_date,
+                            (day_type or "weekday"),
                         )
                     )
                 replace_assignment_history(unit_id, target_period, preserved)
@@ -1891,7 +1908,7 @@ def plan_kayitlari():
     assistant_clinic_weeks: List[Dict[str, Any]] = []
 
     if filters_applied:
-        history_rows = [dict(row) for row in list(list_assignment_history(unit_id, selected_period))]
+        history_rows = [dict(row) for row in list_assignment_history(unit_id, selected_period)]
 
         record = {
             "period": selected_period,
@@ -1983,24 +2000,19 @@ def _store_plan_assignments(
     month: int,
 ) -> int:
     normalized_type = (plan_type or "clinic").strip().lower()
-    if normalized_type not in {"clinic", "nobet"}:
+    slot_spec = PLAN_TYPE_SLOT_SPECS.get(normalized_type)
+    if slot_spec is None:
         raise ValueError("Unknown plan type")
-    store_clinic = normalized_type == "clinic"
-    store_night = normalized_type == "nobet"
+    slot_prefix, store_clinic = slot_spec
 
     new_entries: List[Tuple[int, Optional[int], str, str]] = []
     for assignment in assignments or []:
         slot_id = assignment.get("slot_id") or ""
-        if store_clinic:
-            if not slot_id.startswith("clinic_"):
-                continue
-            clinic_id = _extract_clinic_id(slot_id)
-            if clinic_id is None:
-                continue
-        else:
-            if not slot_id.startswith("duty_"):
-                continue
-            clinic_id = None
+        if not slot_id.startswith(slot_prefix):
+            continue
+        clinic_id = _extract_clinic_id(slot_id) if store_clinic else None
+        if store_clinic and clinic_id is None:
+            continue
         person_identifier = assignment.get("person_id") or ""
         if not isinstance(person_identifier, str) or not person_identifier.startswith("staff_"):
             continue
@@ -2016,27 +2028,23 @@ def _store_plan_assignments(
         new_entries.append((staff_id, clinic_id, assignment_date_obj.isoformat(), day_type))
 
     plan_period = _plan_period(year, month)
-    existing_rows = [dict(row) for row in list(list_assignment_history(unit_id, plan_period))]
+    # Keep the other plan kind's rows for this period; the new entries replace the rest.
+    existing_rows = iter_assignment_history(unit_id, plan_period, has_clinic=not store_clinic)
     preserved_entries: List[Tuple[int, Optional[int], str, str]] = []
-    for record in existing_rows:
-        staff_id_existing = _safe_int(record.get("staff_id"))
-        assignment_date = record.get("assignment_date")
+    for _row_id, staff_id_raw, clinic_id_existing, assignment_date, _period, day_type_raw in existing_rows:
+        staff_id_existing = _safe_int(staff_id_raw)
         if staff_id_existing is None or not assignment_date:
             continue
-        clinic_id_existing = record.get("clinic_id")
-        day_type_existing = (record.get("day_type") or "weekday").strip().lower()
+        day_type_existing = (day_type_raw or "weekday").strip().lower()
         if day_type_existing not in {"weekday", "weekend"}:
             day_type_existing = "weekday"
-        entry_tuple = (staff_id_existing, clinic_id_existing, assignment_date, day_type_existing)
-        if store_clinic:
-            if clinic_id_existing is None:
-                preserved_entries.append(entry_tuple)
-        elif store_night:
-            if clinic_id_existing is not None:
-                preserved_entries.append(entry_tuple)
+        preserved_entries.append(
+            (staff_id_existing, clinic_id_existing, assignment_date, day_type_existing)
+        )
 
+    # Both lists hold int staff ids, ISO dates and canonical day types already.
     combined_entries = preserved_entries + new_entries
-    replace_assignment_history(unit_id, plan_period, combined_entries)
+    replace_assignment_history_bulk(unit_id, plan_period, combined_entries)
     return len(new_entries)
 
 
@@ -2046,8 +2054,8 @@ def plan_duzenle():
     unit_id = _require_unit_id()
 
     if request.method == "POST":
-        year = _safe_int(request.form.get("year"))
-        month = _safe_int(request.form.get("month"))
+        year = request.form.get("year", type=int)
+        month = request.form.get("month", type=int)
         plan_type_raw = (request.form.get("plan_type") or "clinic").strip().lower()
         plan_period_raw = (request.form.get("plan_period") or "").strip()
         submit_action = (request.form.get("submit_action") or "preview").strip().lower()
@@ -2086,16 +2094,16 @@ def plan_duzenle():
 
     selected_period = _plan_period(year, month)
 
-    staff_records = [dict(row) for row in list(list_staff(unit_id))]
+    staff_records = [dict(row) for row in list_staff(unit_id)]
     staff_map = {row["id"]: row for row in staff_records}
-    clinic_records = [dict(row) for row in list(list_clinics(unit_id))]
+    clinic_records = [dict(row) for row in list_clinics(unit_id)]
     clinic_map = {row["id"]: row.get("name") for row in clinic_records}
-    duty_type_records = [dict(row) for row in list(list_duty_types(unit_id))]
+    duty_type_records = [dict(row) for row in list_duty_types(unit_id)]
 
     history_rows_for_period: list[dict[str, Any]] = []
     use_saved_assignments = bool(plan_period_raw and plan_period_raw == selected_period)
     if use_saved_assignments:
-        history_rows_for_period = [dict(row) for row in list(list_assignment_history(unit_id, selected_period))]
+        history_rows_for_period = [dict(row) for row in list_assignment_history(unit_id, selected_period)]
         if not history_rows_for_period:
             use_saved_assignments = False
 
@@ -2302,7 +2310,7 @@ def plan_duzenle():
             "slot_kind": slot_kind,
         })
 
-    month_label = next((label for value, label in MONTH_OPTIONS if value == month), str(month))
+    month_label = MONTH_LABELS.get(month, str(month))
     period_label = f"{_(month_label)} {year}"
     plan_hint = _("Klinik planı") if plan_type == "clinic" else _("Nöbet planı")
     plan_period_value = selected_period if use_saved_assignments else ""
@@ -2325,14 +2333,11 @@ def plan_duzenle():
 @login_required
 def planla_approve():
     unit_id = _require_unit_id()
-    year_raw = request.form.get("year")
-    month_raw = request.form.get("month")
     plan_type_raw = (request.form.get("plan_type") or "clinic").strip().lower()
-    allowed_plan_types = {value for value, _ in PLAN_TYPE_OPTIONS}
-    if plan_type_raw not in allowed_plan_types:
+    if plan_type_raw not in PLAN_TYPE_LABELS:
         plan_type_raw = "clinic"
-    year = _safe_int(year_raw)
-    month = _safe_int(month_raw)
+    year = request.form.get("year", type=int)
+    month = request.form.get("month", type=int)
     if year is None or month is None:
         return redirect(
             url_for(
@@ -2342,8 +2347,8 @@ def planla_approve():
             )
         )
 
-    clinic_records = [dict(row) for row in list(list_clinics(unit_id))]
-    duty_type_records = [dict(row) for row in list(list_duty_types(unit_id))]
+    clinic_records = [dict(row) for row in list_clinics(unit_id)]
+    duty_type_records = [dict(row) for row in list_duty_types(unit_id)]
     result, error_message, _error_status = compute_plan(
         unit_id=unit_id,
         year=year,
@@ -2393,13 +2398,13 @@ def download_plan():
     selected_year = requested_year or today.year
     selected_month = requested_month or today.month
     requested_plan_type = (request.args.get("plan_type") or "clinic").strip().lower()
-    selected_plan_type = requested_plan_type if requested_plan_type in {option[0] for option in PLAN_TYPE_OPTIONS} else "clinic"
+    selected_plan_type = requested_plan_type if requested_plan_type in PLAN_TYPE_LABELS else "clinic"
 
-    staff_rows_for_download = [dict(row) for row in list(list_staff(unit_id))]
+    staff_rows_for_download = [dict(row) for row in list_staff(unit_id)]
     staff_name_map_for_download = {row["id"]: row.get("name") for row in staff_rows_for_download}
 
     clinic_records = []
-    for row in list(list_clinics(unit_id)):
+    for row in list_clinics(unit_id):
         row_dict = dict(row)
         responsible_id = row_dict.get("sorumlu_uzman_id")
         row_dict["responsible_name"] = (
@@ -2407,7 +2412,7 @@ def download_plan():
         )
         clinic_records.append(row_dict)
 
-    duty_type_records = [dict(row) for row in list(list_duty_types(unit_id))]
+    duty_type_records = [dict(row) for row in list_duty_types(unit_id)]
     result, error_message, error_status = compute_plan(
         unit_id=unit_id,
         year=selected_year,
@@ -2429,21 +2434,20 @@ def download_plan():
         plan_type=selected_plan_type,
     )
 
-    df = pd.DataFrame(plan_table["rows"])
-    df = df.reindex(columns=plan_table["headers"])
+    # Passing the column order up front builds each frame once instead of reindexing a copy.
+    sheets = [("Plan", pd.DataFrame(plan_table["rows"], columns=plan_table["headers"]))]
+    if selected_plan_type == "nobet":
+        summary_rows = result.get("cap_summary") or []
+        if summary_rows:
+            sheets.append((_("İcap Özeti"), pd.DataFrame(summary_rows)))
+        night_rows = result.get("night_summary") or []
+        if night_rows:
+            sheets.append((_("Gece Nöbeti Özeti"), pd.DataFrame(night_rows)))
 
     output = io.BytesIO()
     with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="Plan")
-        if selected_plan_type == "nobet":
-            summary_rows = result.get("cap_summary") or []
-            if summary_rows:
-                summary_df = pd.DataFrame(summary_rows)
-                summary_df.to_excel(writer, index=False, sheet_name=_("İcap Özeti"))
-            night_rows = result.get("night_summary") or []
-            if night_rows:
-                night_df = pd.DataFrame(night_rows)
-                night_df.to_excel(writer, index=False, sheet_name=_("Gece Nöbeti Özeti"))
+        for sheet_name, frame in sheets:
+            frame.to_excel(writer, index=False, sheet_name=sheet_name)
     output.seek(0)
 
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
@@ -2471,14 +2475,14 @@ def personel():
     if request.method == "POST":
         action = (request.form.get("action") or "add").strip().lower()
         if action == "delete":
-            staff_id = _safe_int(request.form.get("staff_id"))
+            staff_id = request.form.get("staff_id", type=int)
             if not staff_id:
                 error = _("Geçerli bir personel seçin.")
             else:
                 delete_staff(staff_id, unit_id)
                 return redirect(url_for("personel"))
         elif action == "update":
-            staff_id = _safe_int(request.form.get("staff_id"))
+            staff_id = request.form.get("staff_id", type=int)
             if not staff_id:
                 error = _("Geçerli bir personel seçin.")
             else:
@@ -2612,7 +2616,7 @@ def personel():
 def izinler():
     error = None
     unit_id = _require_unit_id()
-    staff_rows = [dict(row) for row in list(list_staff(unit_id))]
+    staff_rows = [dict(row) for row in list_staff(unit_id)]
     staff_map = {row["id"]: row.get("name") for row in staff_rows}
     form_defaults = {
         "staff_id": "",
@@ -2624,14 +2628,14 @@ def izinler():
     if request.method == "POST":
         action = (request.form.get("action") or "add").strip().lower()
         if action == "delete":
-            leave_id = _safe_int(request.form.get("leave_id"))
+            leave_id = request.form.get("leave_id", type=int)
             if not leave_id:
                 error = _("Geçerli bir izin kaydı seçin.")
             else:
                 delete_leave_request(leave_id, unit_id)
                 return redirect(url_for("izinler"))
         elif action == "add":
-            staff_id = _safe_int(request.form.get("staff_id"))
+            staff_id = request.form.get("staff_id", type=int)
             start_date_raw = (request.form.get("start_date") or "").strip()
             end_date_raw = (request.form.get("end_date") or "").strip()
             reason = (request.form.get("reason") or "").strip()
@@ -2670,7 +2674,7 @@ def izinler():
         else:
             error = _("Bilinmeyen islem tipi.")
 
-    leave_rows = [dict(row) for row in list(list_leave_requests(unit_id))]
+    leave_rows = [dict(row) for row in list_leave_requests(unit_id)]
     leave_entries = []
     for leave in leave_rows:
         staff_id = leave.get("staff_id")
@@ -2708,7 +2712,7 @@ def izinler_legacy():
 def klinikler():
     error = None
     unit_id = _require_unit_id()
-    staff_rows = [dict(row) for row in list(list_staff(unit_id))]
+    staff_rows = [dict(row) for row in list_staff(unit_id)]
     specialists = [
         row
         for row in staff_rows
@@ -2720,11 +2724,9 @@ def klinikler():
         action = (request.form.get("action") or "add").strip()
         if action == "add":
             name = (request.form.get("name") or "").strip()
-            required_raw = request.form.get("required_assistants")
-            required_value = _safe_int(required_raw) or 1
+            required_value = request.form.get("required_assistants", type=int) or 1
             rotation_period = request.form.get("rotation_period") or DEFAULT_ROTATION_PERIOD
-            responsible_raw = request.form.get("responsible_specialist")
-            responsible_id = _safe_int(responsible_raw) if responsible_raw else None
+            responsible_id = request.form.get("responsible_specialist", type=int)
             if responsible_id not in specialist_ids:
                 responsible_id = None
             if required_value < 1:
@@ -2744,7 +2746,7 @@ def klinikler():
                 except sqlite3.IntegrityError:
                     error = _("Bu isimde bir klinik zaten mevcut.")
         elif action in {"move_up", "move_down"}:
-            clinic_id = _safe_int(request.form.get("clinic_id"))
+            clinic_id = request.form.get("clinic_id", type=int)
             if not clinic_id:
                 error = _("Geçerli bir klinik seçin.")
             else:
@@ -2754,12 +2756,10 @@ def klinikler():
                     return redirect(url_for("klinikler"))
                 error = _("Sıralama güncellenemedi.")
         elif action == "update":
-            clinic_id = _safe_int(request.form.get("clinic_id"))
-            required_raw = request.form.get("required_assistants")
-            required_value = _safe_int(required_raw)
+            clinic_id = request.form.get("clinic_id", type=int)
+            required_value = request.form.get("required_assistants", type=int)
             rotation_period = request.form.get("rotation_period") or DEFAULT_ROTATION_PERIOD
-            responsible_raw = request.form.get("responsible_specialist")
-            responsible_id = _safe_int(responsible_raw) if responsible_raw else None
+            responsible_id = request.form.get("responsible_specialist", type=int)
             if responsible_id not in specialist_ids:
                 responsible_id = None
             if not clinic_id:
@@ -2776,10 +2776,9 @@ def klinikler():
                 )
                 return redirect(url_for("klinikler"))
         elif action == "add_rule":
-            clinic_id = _safe_int(request.form.get("clinic_id"))
+            clinic_id = request.form.get("clinic_id", type=int)
             seniority_choice = (request.form.get("required_seniority") or "").strip().lower()
-            count_raw = request.form.get("required_count")
-            count_value = _safe_int(count_raw)
+            count_value = request.form.get("required_count", type=int)
             if not clinic_id:
                 error = _("Geçerli bir klinik seçin.")
             elif seniority_choice not in {choice[0] for choice in SENIORITY_CHOICES}:
@@ -2794,14 +2793,14 @@ def klinikler():
                 else:
                     return redirect(url_for("klinikler"))
         elif action == "delete_rule":
-            rule_id = _safe_int(request.form.get("rule_id"))
+            rule_id = request.form.get("rule_id", type=int)
             if not rule_id:
                 error = _("Geçerli bir kural seçin.")
             else:
                 delete_clinic_seniority_rule(rule_id, unit_id)
                 return redirect(url_for("klinikler"))
         elif action == "delete":
-            clinic_id = _safe_int(request.form.get("clinic_id"))
+            clinic_id = request.form.get("clinic_id", type=int)
             if not clinic_id:
                 error = _("Geçerli bir klinik seçin.")
             else:
@@ -2811,19 +2810,29 @@ def klinikler():
             error = _("Bilinmeyen islem tipi.")
 
     staff_name_map = {row["id"]: row.get("name") for row in staff_rows}
-    rules_lookup = defaultdict(list)
-    for rule_row in list(list_clinic_seniority_rules(unit_id)):
+
+    def format_rule(rule_row: Mapping[str, Any]) -> Dict[str, Any]:
         rule_dict = dict(rule_row)
-        clinic_id = rule_dict.get("clinic_id")
-        if clinic_id is None:
-            continue
         seniority_key = (rule_dict.get("required_seniority") or "").strip().lower()
         rule_dict["required_seniority"] = seniority_key
         rule_dict["seniority_label"] = SENIORITY_LABELS.get(seniority_key, seniority_key.title())
-        rules_lookup[clinic_id].append(rule_dict)
+        return rule_dict
+
+    # Rules arrive ordered by clinic_id, so consecutive rows already form one bucket per clinic.
+    rules_lookup: Dict[int, List[Dict[str, Any]]] = {
+        clinic_id: sorted(
+            (format_rule(rule_row) for rule_row in clinic_rules),
+            key=lambda item: item.get("seniority_label", ""),
+        )
+        for clinic_id, clinic_rules in groupby(
+            list_clinic_seniority_rules(unit_id),
+            key=itemgetter("clinic_id"),
+        )
+        if clinic_id is not None
+    }
 
     clinic_records = []
-    for row in list(list_clinics(unit_id)):
+    for row in list_clinics(unit_id):
         row_dict = dict(row)
         clinic_id = row_dict.get("id")
         rotation_period = (row_dict.get("rotation_period") or DEFAULT_ROTATION_PERIOD).strip().lower()
@@ -2835,10 +2844,7 @@ def klinikler():
         row_dict["responsible_name"] = (
             staff_name_map.get(responsible_id) if responsible_id is not None else None
         )
-        row_dict["seniority_rules"] = sorted(
-            rules_lookup.get(clinic_id, []),
-            key=lambda item: item.get("seniority_label", ""),
-        )
+        row_dict["seniority_rules"] = rules_lookup.get(clinic_id, [])
         clinic_records.append(row_dict)
 
     return render_template(
@@ -2858,8 +2864,8 @@ def nobetler():
     error = None
     unit_id = _require_unit_id()
 
-    duty_types = [dict(row) for row in list(list_duty_types(unit_id))]
-    duty_rules = [dict(row) for row in list(list_duty_seniority_rules(unit_id))]
+    duty_types = [dict(row) for row in list_duty_types(unit_id)]
+    duty_rules = [dict(row) for row in list_duty_seniority_rules(unit_id)]
     duty_type_map = {row["id"]: row for row in duty_types}
 
     rules_lookup: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
@@ -2887,8 +2893,7 @@ def nobetler():
                 name = (request.form.get("name") or "").strip()
                 duration_raw = (request.form.get("duration_hours") or "").strip()
                 category_raw = (request.form.get("duty_category") or "nobet").strip().lower()
-                required_raw = request.form.get("required_staff_count")
-                required_staff = _safe_int(required_raw) or 1
+                required_staff = request.form.get("required_staff_count", type=int) or 1
                 if not name or not duration_raw:
                     error = _("Lütfen tüm alanları doldurun.")
                 else:
@@ -2916,9 +2921,9 @@ def nobetler():
                 except sqlite3.IntegrityError:
                     error = _("Bu isimde bir nöbet türü zaten mevcut.")
         elif action == "add_rule":
-            duty_type_id = _safe_int(request.form.get("duty_type_id"))
+            duty_type_id = request.form.get("duty_type_id", type=int)
             seniority_choice = (request.form.get("required_seniority") or "").strip().lower()
-            count_value = _safe_int(request.form.get("required_count"))
+            count_value = request.form.get("required_count", type=int)
             duty_info = duty_type_map.get(duty_type_id)
             if not duty_type_id or duty_info is None:
                 error = _("Geçerli bir nöbet türü seçin.")
@@ -2956,12 +2961,12 @@ def nobetler():
                     )
                     return redirect(url_for("nobetler"))
         elif action == "delete_rule":
-            rule_id = _safe_int(request.form.get("rule_id"))
+            rule_id = request.form.get("rule_id", type=int)
             if rule_id:
                 delete_duty_seniority_rule(rule_id, unit_id)
             return redirect(url_for("nobetler"))
         elif action == "delete_duty":
-            duty_type_id = _safe_int(request.form.get("duty_type_id"))
+            duty_type_id = request.form.get("duty_type_id", type=int)
             duty_info = duty_type_map.get(duty_type_id)
             if not duty_type_id or duty_info is None:
                 error = _("Geçerli bir nöbet türü seçin.")
@@ -2975,8 +2980,8 @@ def nobetler():
             error = _("Bilinmeyen islem tipi.")
 
     # Refresh duty data for rendering after any modifications
-    duty_types = [dict(row) for row in list(list_duty_types(unit_id))]
-    duty_rules = [dict(row) for row in list(list_duty_seniority_rules(unit_id))]
+    duty_types = [dict(row) for row in list_duty_types(unit_id)]
+    duty_rules = [dict(row) for row in list_duty_seniority_rules(unit_id)]
     rules_lookup = defaultdict(list)
     for rule in duty_rules:
         duty_id = rule.get("duty_type_id")
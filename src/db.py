@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import atexit
+import functools
 import os
 import sqlite3
+import threading
+import weakref
+from collections import defaultdict
 from pathlib import Path
-from typing import Any, Iterable, List, Mapping, Optional, Sequence, Tuple
-
-from werkzeug.security import generate_password_hash
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
 
 try:
     import psycopg2
@@ -23,16 +26,87 @@ if DATABASE_URL and DATABASE_URL.startswith('postgres://'):
 IS_POSTGRES = bool(DATABASE_URL and DATABASE_URL.startswith(("postgres://", "postgresql://")))
 
 DEFAULT_ROTATION_PERIOD = "daily"
-VALID_ROTATION_PERIODS = {
+VALID_ROTATION_PERIODS = frozenset({
     "daily",
     "weekly",
     "biweekly",
     "monthly",
-}
+})
+# Accepted values of the enumerated text columns; anything else is coerced to the
+# default (or rejected, for seniority rules) before it reaches the database.
+VALID_SENIORITY_LEVELS = frozenset({"kidemli", "ara", "comez"})
+DEFAULT_DUTY_CATEGORY = "nobet"
+VALID_DUTY_CATEGORIES = frozenset({"mesa", "nobet"})
+
+# WAL lets readers run alongside the writer. The mode is stored in the database file,
+# so it only needs to be switched on once per process.
+SQLITE_JOURNAL_PRAGMA = "PRAGMA journal_mode = WAL"
+_sqlite_journal_configured = False
+# How long a connection waits on a locked database before raising "database is locked";
+# init_db's BEGIN IMMEDIATE relies on it to queue concurrently starting workers.
+SQLITE_BUSY_TIMEOUT_SECONDS = 5.0
+
+HISTORY_PLAN_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_history_unit_plan "
+    "ON assignment_history(unit_id, plan_month_year, assignment_date, clinic_id, staff_id)"
+)
+# Composite indexes matching the unit-scoped WHERE / ORDER BY clauses of the list_* helpers.
+COMPOSITE_INDEX_STATEMENTS = (
+    "CREATE INDEX IF NOT EXISTS idx_clinics_unit_order ON clinics(unit_id, display_order, id)",
+    "CREATE INDEX IF NOT EXISTS idx_leave_unit_date ON leave_requests(unit_id, start_date, end_date, id)",
+    HISTORY_PLAN_INDEX_SQL,
+    "CREATE INDEX IF NOT EXISTS idx_clinic_rules_unit_clinic ON clinic_seniority_rules(unit_id, clinic_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_duty_rules_unit_duty ON duty_seniority_rules(unit_id, duty_type_id, id)",
+)
+# Child-side indexes for foreign keys: without them every staff or clinic delete scans
+# these tables to cascade (leave requests) or to verify no history still references it.
+HISTORY_STAFF_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_history_staff ON assignment_history(staff_id)"
+)
+HISTORY_CLINIC_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_history_clinic ON assignment_history(clinic_id)"
+)
+FOREIGN_KEY_INDEX_STATEMENTS = (
+    "CREATE INDEX IF NOT EXISTS idx_leave_staff ON leave_requests(staff_id, start_date)",
+    HISTORY_STAFF_INDEX_SQL,
+    HISTORY_CLINIC_INDEX_SQL,
+)
+
+# Per-connection prepared statement cache. Connections live for the whole thread, so every
+# distinct SQL text (filter variants of the list queries, per-size history inserts) is compiled
+# once and then reused; the default of 128 evicts them under normal UI traffic.
+SQLITE_CACHED_STATEMENTS = 512
+# Applied to every new SQLite connection: NORMAL sync is durable enough under WAL,
+# and the cache/mmap sizes keep hot pages in memory.
+SQLITE_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+)
+
+
+class _ThreadSQLiteConnection(sqlite3.Connection):
+    """sqlite3 connection subclass so cached connections can be tracked weakly."""
+
+
+_sqlite_local = threading.local()
+# Weak so connections owned by finished threads are released with their thread-local.
+_sqlite_connections: "weakref.WeakSet[_ThreadSQLiteConnection]" = weakref.WeakSet()
+_sqlite_connections_lock = threading.Lock()
+_inherited_sqlite_connections: List[_ThreadSQLiteConnection] = []
+
 
 DEFAULT_UNIT_NAME = "Varsayilan Unitesi"
 DEFAULT_ADMIN_USERNAME = "admin"
 DEFAULT_ADMIN_PASSWORD = "admin123"
+# generate_password_hash(DEFAULT_ADMIN_PASSWORD), precomputed so bootstrapping a fresh
+# database does not pay for a scrypt run. Regenerate it if the default password changes.
+DEFAULT_ADMIN_PASSWORD_HASH = (
+    "scrypt:32768:8:1$kpqB2Od4YKzDVPH6$23cf62f79e6796aa2ccaaa6802e72da1c3f1a009396a60ef588d47"
+    "f5d450a9bdd7b1505de7f35979a64578c0f5f478a300fd4189da5dd885476d3c9340cbf9e0"
+)
 
 
 class PostgresCursor:
@@ -68,6 +142,7 @@ class PostgresConnection:
         self._conn.close()
 
     @staticmethod
+    @functools.lru_cache(maxsize=SQLITE_CACHED_STATEMENTS)
     def _convert_query(query: str) -> str:
         return query.replace("?", "%s")
 
@@ -89,13 +164,17 @@ class PostgresConnection:
     def rollback(self) -> None:
         self._conn.rollback()
 
-    def cursor(self):
-        return self._conn.cursor(cursor_factory=RealDictCursor)
+    def cursor(self, *, dict_rows: bool = True):
+        return self._conn.cursor(cursor_factory=RealDictCursor if dict_rows else None)
 
     def close(self) -> None:
         self._conn.close()
 
 
+# Arbitrary application-wide key for pg_advisory_xact_lock during schema bootstrap.
+POSTGRES_INIT_LOCK_ID = 0x4F505453
+
+
 def _init_postgres_schema() -> None:
     if not IS_POSTGRES:
         return
@@ -114,7 +193,8 @@ def _init_postgres_schema() -> None:
             id SERIAL PRIMARY KEY,
             username TEXT UNIQUE NOT NULL,
             password_hash TEXT NOT NULL,
-            unit_id INTEGER NOT NULL REFERENCES units(id) ON DELETE CASCADE
+            unit_id INTEGER NOT NULL REFERENCES units(id) ON DELETE CASCADE,
+            unit_name TEXT
         )
         """,
         """
@@ -134,7 +214,7 @@ def _init_postgres_schema() -> None:
         CREATE TABLE IF NOT EXISTS clinics (
             id SERIAL PRIMARY KEY,
             name TEXT UNIQUE NOT NULL,
-            display_order INTEGER,
+            display_order INTEGER NOT NULL,
             required_assistants INTEGER DEFAULT 1,
             rotation_period TEXT DEFAULT 'daily',
             sorumlu_uzman_id INTEGER,
@@ -203,10 +283,16 @@ def _init_postgres_schema() -> None:
         "CREATE INDEX IF NOT EXISTS idx_duty_rules_unit_id ON duty_seniority_rules(unit_id)",
         "CREATE INDEX IF NOT EXISTS idx_assignment_history_unit_id ON assignment_history(unit_id)",
         "CREATE INDEX IF NOT EXISTS idx_leave_requests_unit_id ON leave_requests(unit_id)",
+        *COMPOSITE_INDEX_STATEMENTS,
+        *FOREIGN_KEY_INDEX_STATEMENTS,
     ]
 
-    with psycopg2.connect(DATABASE_URL) as raw_conn:  # type: ignore[arg-type]
-        with raw_conn.cursor() as cur:
+    # One transaction for the whole bootstrap; the connection wrapper commits (or rolls
+    # back) and closes on exit.
+    with PostgresConnection(psycopg2.connect(DATABASE_URL)) as conn:  # type: ignore[arg-type]
+        with conn.cursor() as cur:
+            # Serialize concurrently starting workers, like BEGIN IMMEDIATE on SQLite.
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (POSTGRES_INIT_LOCK_ID,))
             for statement in ddl_statements:
                 cur.execute(statement)
             for statement in index_statements:
@@ -218,36 +304,47 @@ def _init_postgres_schema() -> None:
             cur.execute(
                 "UPDATE staff SET night_duty_exempt = FALSE WHERE night_duty_exempt IS NULL"
             )
-        raw_conn.commit()
-
-    @staticmethod
-    def _convert_query(query: str) -> str:
-        # Psycopg expects %s style placeholders
-        return query.replace("?", "%s")
-
-    def execute(self, query: str, params: Sequence[Any] | Mapping[str, Any] = ()) -> PostgresCursor:
-        sql = self._convert_query(query)
-        cur = self._conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(sql, params)
-        return PostgresCursor(self._conn, cur)
+            cur.execute("UPDATE clinics SET display_order = id WHERE display_order IS NULL")
+            cur.execute("ALTER TABLE clinics ALTER COLUMN display_order SET NOT NULL")
+            cur.execute("ALTER TABLE unit_accounts ADD COLUMN IF NOT EXISTS unit_name TEXT")
+            cur.execute(BACKFILL_ACCOUNT_UNIT_NAME_SQL)
+            cur.execute(ACCOUNT_LOGIN_INDEX_SQL)
+            cur.execute(
+                """
+                CREATE OR REPLACE FUNCTION sync_unit_account_names() RETURNS trigger AS $$
+                BEGIN
+                    UPDATE unit_accounts SET unit_name = NEW.name WHERE unit_id = NEW.id;
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql
+                """
+            )
+            cur.execute("DROP TRIGGER IF EXISTS trg_unit_rename ON units")
+            cur.execute(
+                """
+                CREATE TRIGGER trg_unit_rename AFTER UPDATE OF name ON units
+                FOR EACH ROW EXECUTE FUNCTION sync_unit_account_names()
+                """
+            )
+        default_unit_id = _ensure_default_unit(conn)
+        _ensure_default_admin(conn, default_unit_id)
 
-    def executemany(self, query: str, seq_of_params: Iterable[Sequence[Any]]) -> PostgresCursor:
-        sql = self._convert_query(query)
-        cur = self._conn.cursor(cursor_factory=RealDictCursor)
-        cur.executemany(sql, seq_of_params)
-        return PostgresCursor(self._conn, cur)
 
-    def commit(self) -> None:
-        self._conn.commit()
+SUPPORTS_RETURNING = IS_POSTGRES or sqlite3.sqlite_version_info >= (3, 35, 0)
+SUPPORTS_UPDATE_FROM = IS_POSTGRES or sqlite3.sqlite_version_info >= (3, 33, 0)
 
-    def rollback(self) -> None:
-        self._conn.rollback()
 
-    def cursor(self) -> "psycopg.Cursor[Any]":
-        return self._conn.cursor()
+def _insert_returning_id(conn: Any, query: str, params: Sequence[Any]) -> Optional[int]:
+    """Run a single-row INSERT and return the id of the inserted (or upserted) row.
 
-    def close(self) -> None:
-        self._conn.close()
+    Uses ``RETURNING id`` where available so Postgres skips the extra ``LASTVAL()`` query.
+    Returns None when an ``INSERT ... SELECT ... WHERE`` guard filtered the row out.
+    """
+    if SUPPORTS_RETURNING:
+        row = conn.execute(f"{query.rstrip()} RETURNING id", params).fetchone()
+        return int(row["id"]) if row else None
+    cursor = conn.execute(query, params)
+    return int(cursor.lastrowid) if cursor.rowcount else None
 
 
 def _ensure_units_table(conn: sqlite3.Connection) -> None:
@@ -262,6 +359,28 @@ def _ensure_units_table(conn: sqlite3.Connection) -> None:
     )
 
 
+INSERT_UNIT_ACCOUNT_SQL = """
+    INSERT INTO unit_accounts (username, password_hash, unit_id, unit_name)
+    VALUES (?, ?, ?, (SELECT name FROM units WHERE id = ?))
+"""
+# Covers every column get_account_by_username reads, so Postgres can answer a login with
+# an index-only scan. SQLite's planner keeps the UNIQUE(username) autoindex plus one row
+# fetch, and the lookup leaves that choice to it: a missing index must never break logins.
+ACCOUNT_LOGIN_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_accounts_login "
+    "ON unit_accounts(username, password_hash, unit_id, unit_name)"
+)
+ACCOUNT_LOOKUP_SQL = (
+    "SELECT id, username, password_hash, unit_id, unit_name FROM unit_accounts "
+    "WHERE username = ?"
+)
+BACKFILL_ACCOUNT_UNIT_NAME_SQL = """
+    UPDATE unit_accounts
+    SET unit_name = (SELECT name FROM units WHERE units.id = unit_accounts.unit_id)
+    WHERE unit_name IS NULL
+"""
+
+
 def _ensure_unit_accounts_table(conn: sqlite3.Connection) -> None:
     """Create tenant account table if it does not exist."""
     conn.execute(
@@ -271,6 +390,7 @@ def _ensure_unit_accounts_table(conn: sqlite3.Connection) -> None:
             username TEXT NOT NULL UNIQUE,
             password_hash TEXT NOT NULL,
             unit_id INTEGER NOT NULL,
+            unit_name TEXT,
             FOREIGN KEY (unit_id) REFERENCES units(id) ON DELETE CASCADE
         )
         """
@@ -278,6 +398,20 @@ def _ensure_unit_accounts_table(conn: sqlite3.Connection) -> None:
     conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_unit_accounts_unit_id ON unit_accounts(unit_id)"
     )
+    column_names = {col["name"] for col in _table_columns(conn, "unit_accounts")}
+    if "unit_name" not in column_names:
+        conn.execute("ALTER TABLE unit_accounts ADD COLUMN unit_name TEXT")
+    conn.execute(BACKFILL_ACCOUNT_UNIT_NAME_SQL)
+    conn.execute(ACCOUNT_LOGIN_INDEX_SQL)
+    # Logins read unit_name straight from unit_accounts; keep the copy in step with renames.
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_unit_rename AFTER UPDATE OF name ON units
+        BEGIN
+            UPDATE unit_accounts SET unit_name = NEW.name WHERE unit_id = NEW.id;
+        END
+        """
+    )
 
 
 def _ensure_default_unit(conn: sqlite3.Connection) -> int:
@@ -287,196 +421,319 @@ def _ensure_default_unit(conn: sqlite3.Connection) -> int:
     ).fetchone()
     if row:
         return int(row["id"])
-    cursor = conn.execute(
+    return _insert_returning_id(
+        conn,
         "INSERT INTO units (name) VALUES (?)",
         (DEFAULT_UNIT_NAME,),
     )
-    return int(cursor.lastrowid)
 
 
 def _ensure_default_admin(conn: sqlite3.Connection, unit_id: int) -> None:
     """Provision a bootstrap admin account if none exist."""
-    row = conn.execute("SELECT COUNT(1) AS count FROM unit_accounts").fetchone()
-    if row and int(row["count"]) > 0:
+    if conn.execute("SELECT 1 FROM unit_accounts LIMIT 1").fetchone():
         return
-    password_hash = generate_password_hash(DEFAULT_ADMIN_PASSWORD)
     conn.execute(
-        """
-        INSERT INTO unit_accounts (username, password_hash, unit_id)
-        VALUES (?, ?, ?)
-        """,
-        (DEFAULT_ADMIN_USERNAME, password_hash, unit_id),
+        INSERT_UNIT_ACCOUNT_SQL,
+        (DEFAULT_ADMIN_USERNAME, DEFAULT_ADMIN_PASSWORD_HASH, unit_id, unit_id),
     )
 
 
+# Bump whenever init_db gains a migration step; databases stamped with this
+# PRAGMA user_version skip the migration block entirely.
+CURRENT_SCHEMA_VERSION = 5
+
+SCHEMA_TABLES = (
+    "staff",
+    "clinics",
+    "duty_types",
+    "clinic_seniority_rules",
+    "duty_seniority_rules",
+    "assignment_history",
+    "leave_requests",
+)
+UNIT_SCOPED_TABLE_INDEXES = (
+    ("staff", "idx_staff_unit_id"),
+    ("clinics", "idx_clinics_unit_id"),
+    ("duty_types", "idx_duty_types_unit_id"),
+    ("clinic_seniority_rules", "idx_clinic_rules_unit_id"),
+    ("duty_seniority_rules", "idx_duty_rules_unit_id"),
+    ("assignment_history", "idx_assignment_history_unit_id"),
+    ("leave_requests", "idx_leave_requests_unit_id"),
+)
+
+
+def _table_columns(conn: sqlite3.Connection, table_name: str) -> List[sqlite3.Row]:
+    """Return ``PRAGMA table_info`` rows for a table (empty when it does not exist)."""
+    return conn.execute(f"PRAGMA table_info({table_name})").fetchall()
+
+
 def _ensure_table_has_unit_column(
     conn: sqlite3.Connection,
     table_name: str,
+    column_names: Set[str],
     *,
     index_name: Optional[str] = None,
     default_unit_id: Optional[int] = None,
 ) -> None:
     """Add a unit_id column when missing and backfill existing rows."""
-    columns = conn.execute(f"PRAGMA table_info({table_name})").fetchall()
-    column_names = {col[1] for col in columns}
     if "unit_id" not in column_names:
         conn.execute(
             f"ALTER TABLE {table_name} ADD COLUMN unit_id INTEGER REFERENCES units(id)"
         )
-    if default_unit_id is not None:
-        conn.execute(
-            f"UPDATE {table_name} SET unit_id = ? WHERE unit_id IS NULL",
-            (default_unit_id,),
-        )
     if index_name:
         conn.execute(
             f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name}(unit_id)"
         )
+    # Probe (through the unit_id index) before backfilling so tables that are already
+    # fully tenant-scoped are not rewritten on every migration pass.
+    if default_unit_id is not None and conn.execute(
+        f"SELECT 1 FROM {table_name} WHERE unit_id IS NULL LIMIT 1"
+    ).fetchone():
+        conn.execute(
+            f"UPDATE {table_name} SET unit_id = ? WHERE unit_id IS NULL",
+            (default_unit_id,),
+        )
 
+
+@functools.lru_cache(maxsize=16)
 def _normalize_rotation_period(value: Optional[str]) -> str:
     """Normalize rotation period strings to a limited allow-list."""
-    if not value:
-        return DEFAULT_ROTATION_PERIOD
-    candidate = value.strip().lower()
-    if candidate in VALID_ROTATION_PERIODS:
-        return candidate
-    return DEFAULT_ROTATION_PERIOD
+    candidate = value.strip().lower() if value else ""
+    return candidate if candidate in VALID_ROTATION_PERIODS else DEFAULT_ROTATION_PERIOD
+
+
+def _open_sqlite_connection() -> sqlite3.Connection:
+    """Open a new SQLite connection and apply the connection PRAGMAs."""
+    global _sqlite_journal_configured
+    # Connections stay bound to the thread that opened them; the flag only lets the
+    # exit hook close them from the main thread.
+    conn = sqlite3.connect(
+        DB_PATH,
+        check_same_thread=False,
+        factory=_ThreadSQLiteConnection,
+        timeout=SQLITE_BUSY_TIMEOUT_SECONDS,
+        cached_statements=SQLITE_CACHED_STATEMENTS,
+    )
+    conn.row_factory = sqlite3.Row
+    if not _sqlite_journal_configured:
+        conn.execute(SQLITE_JOURNAL_PRAGMA)
+        _sqlite_journal_configured = True
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _close_sqlite_connections() -> None:
+    """Close every cached SQLite connection; registered to run at interpreter exit."""
+    with _sqlite_connections_lock:
+        connections = list(_sqlite_connections)
+        _sqlite_connections.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:  # pragma: no cover - best effort during shutdown
+            pass
+
+
+def _forget_sqlite_connections_after_fork() -> None:
+    """Start a fresh connection cache in a forked child (e.g. a preloaded gunicorn worker)."""
+    global _sqlite_local, _sqlite_connections_lock
+    # SQLite handles must not cross fork(). Keep the parent's objects referenced instead
+    # of closing them, since closing from the child could release the parent's locks.
+    _inherited_sqlite_connections.extend(_sqlite_connections)
+    _sqlite_connections.clear()
+    _sqlite_local = threading.local()
+    _sqlite_connections_lock = threading.Lock()
+
+
+atexit.register(_close_sqlite_connections)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_sqlite_connections_after_fork)
 
 
 def get_connection():
-    """Create a database connection with sensible defaults."""
+    """Return a database connection with sensible defaults.
+
+    SQLite connections are cached per thread, so callers share the PRAGMA setup and page
+    cache across calls. Using the connection as a context manager commits or rolls back
+    without closing it.
+    """
     if IS_POSTGRES:
         if psycopg2 is None or RealDictCursor is None:
             raise RuntimeError("psycopg is required for PostgreSQL usage.")
         conn = psycopg2.connect(DATABASE_URL)
         return PostgresConnection(conn)
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
+    conn = getattr(_sqlite_local, "conn", None)
+    if conn is None:
+        conn = _open_sqlite_connection()
+        _sqlite_local.conn = conn
+        with _sqlite_connections_lock:
+            _sqlite_connections.add(conn)
     return conn
 
 
+def _begin_write(conn: Any) -> None:
+    """Open a write transaction before a read-modify-write sequence.
+
+    sqlite3 only issues a deferred BEGIN at the first data-modifying statement, so the
+    reads before it would run outside the transaction and the later upgrade to a write
+    lock can fail with SQLITE_BUSY. psycopg2 already opens a transaction implicitly.
+    """
+    if not IS_POSTGRES:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+# Rows pulled from the cursor per round when streaming a result set.
+STREAM_FETCH_ROWS = 1000
+
+
+def _stream_rows(query: str, params: Sequence[Any], *, dict_rows: bool = True) -> Iterator[Any]:
+    """Yield the rows of ``query`` in ``fetchmany`` batches instead of one ``fetchall`` list.
+
+    Mapping rows by default; ``dict_rows=False`` yields plain tuples. The cursor is closed
+    once the generator is exhausted or discarded. On SQLite the stream reads through the
+    shared per-thread connection without committing or rolling back, so it never ends a
+    transaction the caller has open; Postgres streams over a dedicated connection.
+    """
+    conn = get_connection()
+    if IS_POSTGRES:
+        cursor = conn.cursor(dict_rows=dict_rows)
+    else:
+        cursor = conn.cursor()
+        if not dict_rows:
+            cursor.row_factory = None
+    try:
+        if IS_POSTGRES:
+            cursor.execute(PostgresConnection._convert_query(query), params)
+        else:
+            cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(STREAM_FETCH_ROWS)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+        if IS_POSTGRES:
+            conn.close()
+
+
 def init_db() -> None:
     """Ensure required tables exist."""
     if IS_POSTGRES:
         _init_postgres_schema()
-        with get_connection() as conn:
-            default_unit_id = _ensure_default_unit(conn)
-            _ensure_default_admin(conn, default_unit_id)
         return
 
     with get_connection() as conn:
-        _ensure_units_table(conn)
-        _ensure_unit_accounts_table(conn)
+        if _sqlite_schema_version(conn) != CURRENT_SCHEMA_VERSION:
+            # Take the write lock up front so concurrently starting workers queue here
+            # instead of failing to upgrade a read lock, then re-check: another worker
+            # may have finished the migration while this one waited.
+            conn.execute("BEGIN IMMEDIATE")
+            if _sqlite_schema_version(conn) != CURRENT_SCHEMA_VERSION:
+                _migrate_sqlite_schema(conn)
+        default_unit_id = _ensure_default_unit(conn)
+        _ensure_default_admin(conn, default_unit_id)
 
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS staff (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                title TEXT NOT NULL,
-                seniority TEXT,
-                min_night_duties_per_month INTEGER,
-                max_night_duties_per_month INTEGER,
-                education_year INTEGER,
-                night_duty_exempt INTEGER DEFAULT 0,
-                unit_id INTEGER NOT NULL DEFAULT 1,
-                FOREIGN KEY (unit_id) REFERENCES units(id) ON DELETE CASCADE
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS clinics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                display_order INTEGER,
-                required_assistants INTEGER DEFAULT 1,
-                rotation_period TEXT DEFAULT 'daily',
-                sorumlu_uzman_id INTEGER,
-                unit_id INTEGER NOT NULL DEFAULT 1,
-                FOREIGN KEY (unit_id) REFERENCES units(id) ON DELETE CASCADE
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS duty_types (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                duration_hours INTEGER NOT NULL CHECK(duration_hours > 0),
-                duty_category TEXT,
-                required_staff_count INTEGER DEFAULT 1,
-                unit_id INTEGER NOT NULL DEFAULT 1,
-                FOREIGN KEY (unit_id) REFERENCES units(id) ON DELETE CASCADE
-            )
-            """
-        )
-        _ensure_staff_allows_null_seniority(conn)
-        _ensure_duty_type_category(conn)
-        _ensure_staff_training_columns(conn)
-        _ensure_clinic_rotation_period(conn)
-        _ensure_clinic_seniority_rules_table(conn)
-        _ensure_duty_seniority_rules_table(conn)
-        _ensure_assignment_history_table(conn)
-        _ensure_leave_requests_table(conn)
 
-        default_unit_id = _ensure_default_unit(conn)
+def _sqlite_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the schema version stamped in the SQLite file header."""
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
 
-        _ensure_table_has_unit_column(
-            conn,
-            "staff",
-            index_name="idx_staff_unit_id",
-            default_unit_id=default_unit_id,
-        )
-        _ensure_table_has_unit_column(
-            conn,
-            "clinics",
-            index_name="idx_clinics_unit_id",
-            default_unit_id=default_unit_id,
-        )
-        _ensure_table_has_unit_column(
-            conn,
-            "duty_types",
-            index_name="idx_duty_types_unit_id",
-            default_unit_id=default_unit_id,
-        )
-        _ensure_table_has_unit_column(
-            conn,
-            "clinic_seniority_rules",
-            index_name="idx_clinic_rules_unit_id",
-            default_unit_id=default_unit_id,
+
+def _migrate_sqlite_schema(conn: sqlite3.Connection) -> None:
+    """Create and upgrade every SQLite table inside the caller's transaction."""
+    _ensure_units_table(conn)
+    _ensure_unit_accounts_table(conn)
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS staff (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            title TEXT NOT NULL,
+            seniority TEXT,
+            min_night_duties_per_month INTEGER,
+            max_night_duties_per_month INTEGER,
+            education_year INTEGER,
+            night_duty_exempt INTEGER DEFAULT 0,
+            unit_id INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (unit_id) REFERENCES units(id) ON DELETE CASCADE
         )
-        _ensure_table_has_unit_column(
-            conn,
-            "duty_seniority_rules",
-            index_name="idx_duty_rules_unit_id",
-            default_unit_id=default_unit_id,
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS clinics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            display_order INTEGER NOT NULL,
+            required_assistants INTEGER DEFAULT 1,
+            rotation_period TEXT DEFAULT 'daily',
+            sorumlu_uzman_id INTEGER,
+            unit_id INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (unit_id) REFERENCES units(id) ON DELETE CASCADE
         )
-        _ensure_table_has_unit_column(
-            conn,
-            "assignment_history",
-            index_name="idx_assignment_history_unit_id",
-            default_unit_id=default_unit_id,
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS duty_types (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            duration_hours INTEGER NOT NULL CHECK(duration_hours > 0),
+            duty_category TEXT,
+            required_staff_count INTEGER DEFAULT 1,
+            unit_id INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (unit_id) REFERENCES units(id) ON DELETE CASCADE
         )
+        """
+    )
+    _ensure_clinic_seniority_rules_table(conn)
+    _ensure_duty_seniority_rules_table(conn)
+    _ensure_leave_requests_table(conn)
+
+    schema = {table: _table_columns(conn, table) for table in SCHEMA_TABLES}
+    if _ensure_staff_allows_null_seniority(conn, schema["staff"]):
+        schema["staff"] = _table_columns(conn, "staff")
+    if _ensure_assignment_history_table(conn, schema["assignment_history"]):
+        schema["assignment_history"] = _table_columns(conn, "assignment_history")
+    column_names = {
+        table: {col["name"] for col in columns} for table, columns in schema.items()
+    }
+    _ensure_duty_type_category(conn, column_names["duty_types"])
+    _ensure_staff_training_columns(conn, column_names["staff"])
+    _ensure_clinic_rotation_period(conn, column_names["clinics"])
+
+    default_unit_id = _ensure_default_unit(conn)
+
+    for table_name, index_name in UNIT_SCOPED_TABLE_INDEXES:
         _ensure_table_has_unit_column(
             conn,
-            "leave_requests",
-            index_name="idx_leave_requests_unit_id",
+            table_name,
+            column_names[table_name],
+            index_name=index_name,
             default_unit_id=default_unit_id,
         )
 
-        _normalize_clinic_display_order(conn, unit_id=None)
-        _ensure_default_admin(conn, default_unit_id)
-        conn.commit()
+    for statement in (*COMPOSITE_INDEX_STATEMENTS, *FOREIGN_KEY_INDEX_STATEMENTS):
+        conn.execute(statement)
+
+    _normalize_clinic_display_order(conn, unit_id=None)
+    conn.execute(f"PRAGMA user_version = {CURRENT_SCHEMA_VERSION}")
+
 
 
 
+def _ensure_staff_allows_null_seniority(
+    conn: sqlite3.Connection,
+    columns: Sequence[sqlite3.Row],
+) -> bool:
+    """Ensure seniority column allows NULL and staff table has night duty limit columns.
 
-def _ensure_staff_allows_null_seniority(conn: sqlite3.Connection) -> None:
-    """Ensure seniority column allows NULL and staff table has night duty limit columns."""
-    columns = conn.execute("PRAGMA table_info(staff)").fetchall()
+    Returns True when the table had to be rebuilt.
+    """
     column_names = {col[1] for col in columns}
     seniority_info = next((col for col in columns if col[1] == "seniority"), None)
     needs_rebuild = (
@@ -487,7 +744,7 @@ def _ensure_staff_allows_null_seniority(conn: sqlite3.Connection) -> None:
         or "night_duty_exempt" not in column_names
     )
     if not needs_rebuild:
-        return
+        return False
 
     conn.execute(
         """
@@ -528,18 +785,17 @@ def _ensure_staff_allows_null_seniority(conn: sqlite3.Connection) -> None:
     )
     conn.execute("DROP TABLE staff")
     conn.execute("ALTER TABLE staff__migrate RENAME TO staff")
+    return True
 
 
-def _ensure_staff_training_columns(conn: sqlite3.Connection) -> None:
+def _ensure_staff_training_columns(conn: sqlite3.Connection, column_names: Set[str]) -> None:
     """Ensure staff table exposes education year and night duty exemption flags."""
-    columns = conn.execute("PRAGMA table_info(staff)").fetchall()
-    column_names = {col[1] for col in columns}
     if "education_year" not in column_names:
         conn.execute("ALTER TABLE staff ADD COLUMN education_year INTEGER")
     if "night_duty_exempt" not in column_names:
         conn.execute("ALTER TABLE staff ADD COLUMN night_duty_exempt INTEGER DEFAULT 0")
     conn.execute(
-        "UPDATE staff SET night_duty_exempt = COALESCE(night_duty_exempt, 0)"
+        "UPDATE staff SET night_duty_exempt = 0 WHERE night_duty_exempt IS NULL"
     )
 
 
@@ -557,51 +813,89 @@ def _ensure_clinic_display_order(conn: sqlite3.Connection) -> None:
         "UPDATE clinics "
         "SET required_assistants = CASE WHEN required_assistants IS NULL OR required_assistants < 1 THEN 1 ELSE required_assistants END"
     )
-    _normalize_clinic_display_order(conn, unit_id=None)
+    _normalize_clinic_display_order(
+        conn, unit_id=None, has_unit_column="unit_id" in column_names
+    )
 
 
 def _normalize_clinic_display_order(
     conn: sqlite3.Connection,
     unit_id: Optional[int],
+    *,
+    has_unit_column: bool = True,
 ) -> None:
-    """Ensure clinic display_order values are sequential per unit."""
-    columns = conn.execute("PRAGMA table_info(clinics)").fetchall()
-    column_names = {col["name"] for col in columns}
-    has_unit_column = "unit_id" in column_names
+    """Ensure clinic display_order values are sequential per unit.
 
-    if has_unit_column and unit_id is None:
-        unit_rows = conn.execute(
-            "SELECT DISTINCT unit_id FROM clinics WHERE unit_id IS NOT NULL"
-        ).fetchall()
-        for row in unit_rows:
-            _normalize_clinic_display_order(conn, int(row["unit_id"]))
-        return
+    Legacy NULL orders sort by id here; afterwards every clinic has a display_order, so
+    readers can order by ``(display_order, id)`` straight off idx_clinics_unit_order.
 
-    if has_unit_column and unit_id is not None:
-        rows = conn.execute(
+    ``has_unit_column`` only needs to be False while migrating a pre-tenant schema;
+    ``init_db`` guarantees the column afterwards.
+    """
+    if not has_unit_column:
+        conn.execute(
             """
-            SELECT id FROM clinics
-            WHERE unit_id = ?
-            ORDER BY COALESCE(display_order, id) ASC, id ASC
+            WITH ordered AS (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY COALESCE(display_order, id), id) AS rn
+                FROM clinics
+            )
+            UPDATE clinics
+            SET display_order = (SELECT rn FROM ordered WHERE ordered.id = clinics.id)
+            """
+        )
+    elif unit_id is None:
+        conn.execute(
+            """
+            WITH ordered AS (
+                SELECT
+                    id,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY unit_id ORDER BY COALESCE(display_order, id), id
+                    ) AS rn
+                FROM clinics
+                WHERE unit_id IS NOT NULL
+            )
+            UPDATE clinics
+            SET display_order = (SELECT rn FROM ordered WHERE ordered.id = clinics.id)
+            WHERE unit_id IS NOT NULL
+            """
+        )
+    elif SUPPORTS_UPDATE_FROM:
+        # Join the numbering once and write only the rows whose position changed, e.g.
+        # just the clinics after the gap left by a delete.
+        conn.execute(
+            """
+            WITH ordered AS (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY COALESCE(display_order, id), id) AS rn
+                FROM clinics
+                WHERE unit_id = ?
+            )
+            UPDATE clinics
+            SET display_order = ordered.rn
+            FROM ordered
+            WHERE clinics.id = ordered.id
+              AND (clinics.display_order IS NULL OR clinics.display_order <> ordered.rn)
             """,
             (unit_id,),
-        ).fetchall()
+        )
     else:
-        rows = conn.execute(
-            "SELECT id FROM clinics ORDER BY COALESCE(display_order, id) ASC, id ASC"
-        ).fetchall()
-
-    for index, row in enumerate(rows, start=1):
         conn.execute(
-            "UPDATE clinics SET display_order = ? WHERE id = ?",
-            (index, row["id"]),
+            """
+            WITH ordered AS (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY COALESCE(display_order, id), id) AS rn
+                FROM clinics
+                WHERE unit_id = ?
+            )
+            UPDATE clinics
+            SET display_order = (SELECT rn FROM ordered WHERE ordered.id = clinics.id)
+            WHERE unit_id = ?
+            """,
+            (unit_id, unit_id),
         )
 
 
-def _ensure_clinic_rotation_period(conn: sqlite3.Connection) -> None:
+def _ensure_clinic_rotation_period(conn: sqlite3.Connection, column_names: Set[str]) -> None:
     """Ensure clinics expose rotation period metadata with sane defaults."""
-    columns = conn.execute("PRAGMA table_info(clinics)").fetchall()
-    column_names = {col["name"] for col in columns}
     if "rotation_period" not in column_names:
         conn.execute("ALTER TABLE clinics ADD COLUMN rotation_period TEXT")
     conn.execute(
@@ -668,98 +962,106 @@ def _ensure_leave_requests_table(conn: sqlite3.Connection) -> None:
     )
 
 
-def _ensure_assignment_history_table(conn: sqlite3.Connection) -> None:
-    """Create assignment history table to persist monthly schedules."""
-    columns = conn.execute("PRAGMA table_info(assignment_history)").fetchall()
+# SQLite stores history compactly: dates as YYYYMMDD, periods as YYYYMM and
+# day types as HISTORY_DAY_TYPE_CODES. list_assignment_history decodes them back.
+HISTORY_DAY_TYPE_CODES = {"weekday": 0, "weekend": 1}
+SQLITE_STRICT_SUFFIX = " STRICT" if sqlite3.sqlite_version_info >= (3, 37, 0) else ""
+SQLITE_ASSIGNMENT_HISTORY_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        staff_id INTEGER NOT NULL,
+        clinic_id INTEGER,
+        assignment_date INTEGER NOT NULL,
+        plan_month_year INTEGER NOT NULL,
+        day_type INTEGER NOT NULL DEFAULT 0,
+        unit_id INTEGER NOT NULL DEFAULT 1,
+        FOREIGN KEY (staff_id) REFERENCES staff(id),
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id),
+        FOREIGN KEY (unit_id) REFERENCES units(id) ON DELETE CASCADE
+    )
+"""
+
+
+def _ensure_assignment_history_table(
+    conn: sqlite3.Connection,
+    columns: Sequence[sqlite3.Row],
+) -> bool:
+    """Create or migrate the assignment history table that persists monthly schedules.
+
+    Returns True when the table was created or rebuilt.
+    """
     if not columns:
         conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS assignment_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                staff_id INTEGER NOT NULL,
-                clinic_id INTEGER,
-                assignment_date TEXT NOT NULL,
-                plan_month_year TEXT NOT NULL,
-                day_type TEXT,
-                unit_id INTEGER NOT NULL DEFAULT 1,
-                FOREIGN KEY (staff_id) REFERENCES staff(id),
-                FOREIGN KEY (clinic_id) REFERENCES clinics(id),
-                FOREIGN KEY (unit_id) REFERENCES units(id) ON DELETE CASCADE
-            )
-            """
+            SQLITE_ASSIGNMENT_HISTORY_DDL.format(table="assignment_history") + SQLITE_STRICT_SUFFIX
         )
-        return
+        return True
 
-    column_names = {col["name"] for col in columns}
-    clinic_info = next((col for col in columns if col["name"] == "clinic_id"), None)
-    needs_rebuild = False
-    if clinic_info and clinic_info["notnull"]:
-        needs_rebuild = True
-    if "day_type" not in column_names:
-        needs_rebuild = True
+    column_info = {col["name"]: col for col in columns}
+    clinic_info = column_info.get("clinic_id")
+    date_info = column_info.get("assignment_date")
+    needs_rebuild = (
+        bool(clinic_info and clinic_info["notnull"])
+        or "day_type" not in column_info
+        or (date_info is not None and (date_info["type"] or "").upper() != "INTEGER")
+    )
 
     if needs_rebuild:
         conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS assignment_history__migrate (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                staff_id INTEGER NOT NULL,
-                clinic_id INTEGER,
-                assignment_date TEXT NOT NULL,
-                plan_month_year TEXT NOT NULL,
-                day_type TEXT,
-                unit_id INTEGER NOT NULL DEFAULT 1,
-                FOREIGN KEY (staff_id) REFERENCES staff(id),
-                FOREIGN KEY (clinic_id) REFERENCES clinics(id),
-                FOREIGN KEY (unit_id) REFERENCES units(id) ON DELETE CASCADE
-            )
-            """
+            SQLITE_ASSIGNMENT_HISTORY_DDL.format(table="assignment_history__migrate")
+            + SQLITE_STRICT_SUFFIX
+        )
+        day_type_select = (
+            "CASE LOWER(TRIM(day_type)) WHEN 'weekend' THEN 1 ELSE 0 END"
+            if "day_type" in column_info
+            else "0"
         )
-        day_type_select = "day_type" if "day_type" in column_names else "'weekday'"
-        unit_select = "unit_id" if "unit_id" in column_names else str(_ensure_default_unit(conn))
+        unit_select = "unit_id" if "unit_id" in column_info else str(_ensure_default_unit(conn))
         conn.execute(
             f"""
             INSERT INTO assignment_history__migrate (id, staff_id, clinic_id, assignment_date, plan_month_year, day_type, unit_id)
-            SELECT id, staff_id, clinic_id, assignment_date, plan_month_year, {day_type_select}, {unit_select}
+            SELECT
+                id,
+                staff_id,
+                clinic_id,
+                CAST(REPLACE(SUBSTR(assignment_date, 1, 10), '-', '') AS INTEGER),
+                CAST(REPLACE(plan_month_year, '-', '') AS INTEGER),
+                {day_type_select},
+                {unit_select}
             FROM assignment_history
             """
         )
         conn.execute("DROP TABLE assignment_history")
         conn.execute("ALTER TABLE assignment_history__migrate RENAME TO assignment_history")
-    elif "day_type" not in column_names:
-        conn.execute("ALTER TABLE assignment_history ADD COLUMN day_type TEXT")
+    return needs_rebuild
 
 
-def _ensure_duty_type_category(conn: sqlite3.Connection) -> None:
+def _ensure_duty_type_category(conn: sqlite3.Connection, column_names: Set[str]) -> None:
     """Ensure duty_types have a category column with sensible defaults."""
-    columns = conn.execute("PRAGMA table_info(duty_types)").fetchall()
-    column_names = {col["name"] for col in columns}
     if "duty_category" not in column_names:
         conn.execute("ALTER TABLE duty_types ADD COLUMN duty_category TEXT")
     if "required_staff_count" not in column_names:
         conn.execute("ALTER TABLE duty_types ADD COLUMN required_staff_count INTEGER")
     conn.execute(
         "UPDATE duty_types "
-        "SET duty_category = COALESCE(NULLIF(TRIM(duty_category), ''), 'nobet')"
+        "SET duty_category = 'nobet' "
+        "WHERE duty_category IS NULL OR TRIM(duty_category) = ''"
     )
     conn.execute(
         "UPDATE duty_types "
-        "SET required_staff_count = CASE "
-        "WHEN required_staff_count IS NULL OR required_staff_count < 1 THEN 1 "
-        "ELSE required_staff_count "
-        "END"
+        "SET required_staff_count = 1 "
+        "WHERE required_staff_count IS NULL OR required_staff_count < 1"
     )
 
 
 def create_unit(name: str) -> int:
     """Create a new medical unit and return its ID."""
     with get_connection() as conn:
-        cursor = conn.execute(
+        unit_id = _insert_returning_id(
+            conn,
             "INSERT INTO units (name) VALUES (?)",
             (name.strip(),),
         )
-        conn.commit()
-        return int(cursor.lastrowid)
+        return unit_id
 
 
 def list_units() -> Iterable[Mapping[str, Any]]:
@@ -784,60 +1086,102 @@ def get_unit_by_id(unit_id: int) -> Optional[Mapping[str, Any]]:
 def create_unit_account(username: str, password_hash: str, unit_id: int) -> int:
     """Create a login account for a unit."""
     with get_connection() as conn:
-        cursor = conn.execute(
-            """
-            INSERT INTO unit_accounts (username, password_hash, unit_id)
-            VALUES (?, ?, ?)
-            """,
-            (username.strip().lower(), password_hash, unit_id),
+        account_id = _insert_returning_id(
+            conn,
+            INSERT_UNIT_ACCOUNT_SQL,
+            (username.strip().lower(), password_hash, unit_id, unit_id),
         )
-        conn.commit()
-        return int(cursor.lastrowid)
+        return account_id
 
 
 def get_account_by_username(username: str) -> Optional[Mapping[str, Any]]:
     """Fetch an account row by username."""
     with get_connection() as conn:
         row = conn.execute(
-            """
-            SELECT unit_accounts.id, unit_accounts.username, unit_accounts.password_hash, unit_accounts.unit_id, units.name AS unit_name
-            FROM unit_accounts
-            JOIN units ON units.id = unit_accounts.unit_id
-            WHERE unit_accounts.username = ?
-            """,
+            ACCOUNT_LOOKUP_SQL,
             (username.strip().lower(),),
         ).fetchone()
     return row
 
 
-def list_staff(unit_id: int) -> Iterable[Mapping[str, Optional[str]]]:
-    """Return all staff rows ordered by id."""
-    with get_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                id,
-                name,
-                title,
-                seniority,
-                min_night_duties_per_month,
-                max_night_duties_per_month,
-                education_year,
-                night_duty_exempt
-            FROM staff
-            WHERE unit_id = ?
-            ORDER BY id ASC
-            """,
-            (unit_id,),
-        ).fetchall()
-    return rows
-
-
-def add_staff(
-    name: str,
-    title: str,
-    seniority: Optional[str],
-    *,
+def list_staff(unit_id: int) -> Iterator[Mapping[str, Optional[str]]]:
+    """Stream all staff rows ordered by id; the result can be iterated once."""
+    return _stream_rows(
+        """
+        SELECT
+            id,
+            name,
+            title,
+            seniority,
+            min_night_duties_per_month,
+            max_night_duties_per_month,
+            education_year,
+            night_duty_exempt
+        FROM staff
+        WHERE unit_id = ?
+        ORDER BY id ASC
+        """,
+        (unit_id,),
+    )
+
+
+INSERT_STAFF_SQL = """
+    INSERT INTO staff (
+        name,
+        title,
+        seniority,
+        min_night_duties_per_month,
+        max_night_duties_per_month,
+        education_year,
+        night_duty_exempt,
+        unit_id
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _normalize_education_year(education_year: Optional[int]) -> Optional[int]:
+    """Return the education year when it falls in the supported 1-5 range."""
+    if education_year is None:
+        return None
+    try:
+        year_candidate = int(education_year)
+    except (TypeError, ValueError):
+        return None
+    return year_candidate if 1 <= year_candidate <= 5 else None
+
+
+def _staff_insert_values(
+    name: str,
+    title: str,
+    seniority: Optional[str],
+    *,
+    min_night: Optional[int],
+    max_night: Optional[int],
+    education_year: Optional[int],
+    night_duty_exempt: bool,
+    unit_id: int,
+) -> Tuple[Any, ...]:
+    """Normalize staff fields into the parameter tuple for INSERT_STAFF_SQL."""
+    min_value = min_night if min_night is not None and min_night >= 0 else None
+    max_value = max_night if max_night is not None and max_night >= 0 else None
+    return (
+        name.strip(),
+        title.strip(),
+        seniority.strip() if seniority else None,
+        min_value,
+        max_value,
+        _normalize_education_year(education_year),
+        1 if night_duty_exempt else 0,
+        unit_id,
+    )
+
+
+def add_staff(
+    name: str,
+    title: str,
+    seniority: Optional[str],
+    *,
     min_night: Optional[int] = None,
     max_night: Optional[int] = None,
     education_year: Optional[int] = None,
@@ -845,47 +1189,47 @@ def add_staff(
     unit_id: int,
 ) -> int:
     """Insert a staff record and return the new row ID."""
-    min_value = min_night if min_night is not None and min_night >= 0 else None
-    max_value = max_night if max_night is not None and max_night >= 0 else None
-    year_value: Optional[int]
-    if education_year is None:
-        year_value = None
-    else:
-        try:
-            year_candidate = int(education_year)
-        except (TypeError, ValueError):
-            year_value = None
-        else:
-            year_value = year_candidate if 1 <= year_candidate <= 5 else None
-    night_value = 1 if night_duty_exempt else 0
     with get_connection() as conn:
-        cursor = conn.execute(
-            """
-            INSERT INTO staff (
+        staff_id = _insert_returning_id(
+            conn,
+            INSERT_STAFF_SQL,
+            _staff_insert_values(
                 name,
                 title,
                 seniority,
-                min_night_duties_per_month,
-                max_night_duties_per_month,
-                education_year,
-                night_duty_exempt,
-                unit_id
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                name.strip(),
-                title.strip(),
-                seniority.strip() if seniority else None,
-                min_value,
-                max_value,
-                year_value,
-                night_value,
-                unit_id,
+                min_night=min_night,
+                max_night=max_night,
+                education_year=education_year,
+                night_duty_exempt=night_duty_exempt,
+                unit_id=unit_id,
             ),
         )
-        conn.commit()
-        return cursor.lastrowid
+        return staff_id
+
+
+def add_staff_many(rows: Iterable[Mapping[str, Any]], *, unit_id: int) -> List[int]:
+    """Insert several staff records in one transaction and return their new IDs in input order.
+
+    Each row uses the keyword names of :func:`add_staff` (``name``, ``title``, ``seniority``,
+    ``min_night``, ``max_night``, ``education_year``, ``night_duty_exempt``).
+    """
+    values = [
+        _staff_insert_values(
+            row["name"],
+            row["title"],
+            row.get("seniority"),
+            min_night=row.get("min_night"),
+            max_night=row.get("max_night"),
+            education_year=row.get("education_year"),
+            night_duty_exempt=bool(row.get("night_duty_exempt")),
+            unit_id=unit_id,
+        )
+        for row in rows
+    ]
+    if not values:
+        return []
+    with get_connection() as conn:
+        return [_insert_returning_id(conn, INSERT_STAFF_SQL, row_values) for row_values in values]
 
 
 def delete_staff(staff_id: int, unit_id: int) -> None:
@@ -895,7 +1239,6 @@ def delete_staff(staff_id: int, unit_id: int) -> None:
             "DELETE FROM staff WHERE id = ? AND unit_id = ?",
             (staff_id, unit_id),
         )
-        conn.commit()
 
 
 def get_staff_by_id(staff_id: int, unit_id: int) -> Optional[Mapping[str, Optional[str]]]:
@@ -934,7 +1277,7 @@ def update_staff_preferences(
     normalized_seniority: Optional[str] = None
     if seniority:
         candidate = seniority.strip().lower()
-        if candidate in {"kidemli", "ara", "comez"}:
+        if candidate in VALID_SENIORITY_LEVELS:
             normalized_seniority = candidate
 
     min_value = min_night if (min_night is not None and min_night >= 0) else None
@@ -942,16 +1285,7 @@ def update_staff_preferences(
     if min_value is not None and max_value is not None and min_value > max_value:
         min_value, max_value = None, None
 
-    if education_year is None:
-        year_value = None
-    else:
-        try:
-            year_candidate = int(education_year)
-        except (TypeError, ValueError):
-            year_value = None
-        else:
-            year_value = year_candidate if 1 <= year_candidate <= 5 else None
-
+    year_value = _normalize_education_year(education_year)
     night_value = 1 if night_duty_exempt else 0
 
     with get_connection() as conn:
@@ -968,22 +1302,51 @@ def update_staff_preferences(
             """,
             (normalized_seniority, min_value, max_value, year_value, night_value, staff_id, unit_id),
         )
-        conn.commit()
 
 
-def list_clinics(unit_id: int) -> Iterable[Mapping[str, Optional[str]]]:
-    """Return all clinics."""
-    with get_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT id, name, display_order, required_assistants, rotation_period, sorumlu_uzman_id
-            FROM clinics
-            WHERE unit_id = ?
-            ORDER BY COALESCE(display_order, id) ASC, id ASC
-            """,
-            (unit_id,),
-        ).fetchall()
-    return rows
+def list_clinics(unit_id: int) -> Iterator[Mapping[str, Optional[str]]]:
+    """Stream all clinics in display order; the result can be iterated once."""
+    return _stream_rows(
+        """
+        SELECT id, name, display_order, required_assistants, rotation_period, sorumlu_uzman_id
+        FROM clinics
+        WHERE unit_id = ?
+        ORDER BY display_order ASC, id ASC
+        """,
+        (unit_id,),
+    )
+
+
+# The new clinic goes to the end of the unit's order, computed inside the INSERT; in a
+# bulk insert each row sees the ones inserted before it.
+INSERT_CLINIC_SQL = """
+    INSERT INTO clinics (name, display_order, required_assistants, rotation_period, sorumlu_uzman_id, unit_id)
+    VALUES (
+        ?,
+        (SELECT COALESCE(MAX(display_order), 0) + 1 FROM clinics WHERE unit_id = ?),
+        ?, ?, ?, ?
+    )
+"""
+
+
+def _clinic_insert_values(
+    name: str,
+    required_assistants: Optional[int],
+    sorumlu_uzman_id: Optional[int],
+    rotation_period: Optional[str],
+    *,
+    unit_id: int,
+) -> Tuple[Any, ...]:
+    """Normalize clinic fields into the parameter tuple for INSERT_CLINIC_SQL."""
+    assistants = required_assistants if required_assistants and required_assistants > 0 else 1
+    return (
+        name.strip(),
+        unit_id,
+        assistants,
+        _normalize_rotation_period(rotation_period),
+        sorumlu_uzman_id,
+        unit_id,
+    )
 
 
 def add_clinic(
@@ -996,29 +1359,36 @@ def add_clinic(
 ) -> int:
     """Insert a clinic and return new ID."""
     with get_connection() as conn:
-        max_order_row = conn.execute(
-            "SELECT MAX(display_order) AS max_display_order FROM clinics WHERE unit_id = ?",
-            (unit_id,),
-        ).fetchone()
-        if max_order_row:
-            try:
-                max_order = max_order_row["max_display_order"]
-            except (TypeError, KeyError):
-                max_order = max_order_row[0]
-        else:
-            max_order = None
-        next_order = (int(max_order) + 1) if max_order is not None else 1
-        assistants = required_assistants if required_assistants and required_assistants > 0 else 1
-        rotation = _normalize_rotation_period(rotation_period)
-        cursor = conn.execute(
-            """
-            INSERT INTO clinics (name, display_order, required_assistants, rotation_period, sorumlu_uzman_id, unit_id)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (name.strip(), next_order, assistants, rotation, sorumlu_uzman_id, unit_id),
+        clinic_id = _insert_returning_id(
+            conn,
+            INSERT_CLINIC_SQL,
+            _clinic_insert_values(
+                name, required_assistants, sorumlu_uzman_id, rotation_period, unit_id=unit_id
+            ),
+        )
+        return clinic_id
+
+
+def add_clinic_many(rows: Iterable[Mapping[str, Any]], *, unit_id: int) -> List[int]:
+    """Insert several clinics in one transaction and return their new IDs in input order.
+
+    Each row uses the keyword names of :func:`add_clinic`; clinics are appended to the
+    unit's display order in the given order.
+    """
+    values = [
+        _clinic_insert_values(
+            row["name"],
+            row.get("required_assistants"),
+            row.get("sorumlu_uzman_id"),
+            row.get("rotation_period"),
+            unit_id=unit_id,
         )
-        conn.commit()
-        return cursor.lastrowid
+        for row in rows
+    ]
+    if not values:
+        return []
+    with get_connection() as conn:
+        return [_insert_returning_id(conn, INSERT_CLINIC_SQL, row_values) for row_values in values]
 
 
 def update_clinic_required_assistants(
@@ -1041,32 +1411,32 @@ def update_clinic_required_assistants(
             """,
             (required, sorumlu_uzman_id, rotation, clinic_id, unit_id),
         )
-        conn.commit()
 
 
 def delete_clinic(clinic_id: int, unit_id: int) -> None:
-    """Delete a clinic and renormalize ordering."""
+    """Delete a clinic and renormalize ordering in the same transaction."""
     with get_connection() as conn:
         conn.execute(
             "DELETE FROM clinics WHERE id = ? AND unit_id = ?",
             (clinic_id, unit_id),
         )
         _normalize_clinic_display_order(conn, unit_id=unit_id)
-        conn.commit()
 
 
 def reorder_clinic(clinic_id: int, offset: int, *, unit_id: int) -> bool:
     """Move a clinic up or down in the display order."""
     with get_connection() as conn:
+        _begin_write(conn)
         rows = conn.execute(
             """
-            SELECT id FROM clinics
+            SELECT id, display_order FROM clinics
             WHERE unit_id = ?
-            ORDER BY COALESCE(display_order, id) ASC, id ASC
+            ORDER BY display_order ASC, id ASC
             """,
             (unit_id,),
         ).fetchall()
         ids = [row["id"] for row in rows]
+        current_orders = {row["id"]: row["display_order"] for row in rows}
         try:
             index = ids.index(clinic_id)
         except ValueError:
@@ -1077,20 +1447,31 @@ def reorder_clinic(clinic_id: int, offset: int, *, unit_id: int) -> bool:
             return False
 
         ids[index], ids[new_index] = ids[new_index], ids[index]
-        for order, cid in enumerate(ids, start=1):
+        # Normally only the swapped pair changes; rewrite just the rows whose order moved.
+        changed = [
+            (cid, order)
+            for order, cid in enumerate(ids, start=1)
+            if current_orders[cid] != order
+        ]
+        if changed:
+            case_sql = " ".join("WHEN ? THEN ?" for _ in changed)
+            id_placeholders = ", ".join("?" for _ in changed)
+            params: List[Any] = [value for pair in changed for value in pair]
+            params.append(unit_id)
+            params.extend(cid for cid, _order in changed)
             conn.execute(
-                "UPDATE clinics SET display_order = ? WHERE id = ? AND unit_id = ?",
-                (order, cid, unit_id),
+                f"UPDATE clinics SET display_order = CASE id {case_sql} END "
+                f"WHERE unit_id = ? AND id IN ({id_placeholders})",
+                params,
             )
-        conn.commit()
         return True
 
 
 def list_clinic_seniority_rules(
     unit_id: int,
     clinic_id: Optional[int] = None,
-) -> Iterable[Mapping[str, Optional[str]]]:
-    """Fetch clinic seniority rules; optionally limit to a single clinic."""
+) -> Iterator[Mapping[str, Optional[str]]]:
+    """Stream clinic seniority rules, optionally limited to a single clinic; one pass only."""
     query = (
         "SELECT id, clinic_id, required_seniority, required_count "
         "FROM clinic_seniority_rules "
@@ -1101,9 +1482,26 @@ def list_clinic_seniority_rules(
         query += "AND clinic_id = ? "
         params.append(clinic_id)
     query += "ORDER BY clinic_id ASC, id ASC"
-    with get_connection() as conn:
-        rows = conn.execute(query, tuple(params)).fetchall()
-    return rows
+    return _stream_rows(query, tuple(params))
+
+
+UPSERT_CLINIC_SENIORITY_RULE_SQL = """
+    INSERT INTO clinic_seniority_rules (clinic_id, required_seniority, required_count, unit_id)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(clinic_id, required_seniority) DO UPDATE SET required_count=excluded.required_count
+"""
+
+
+def _normalize_seniority_rule(required_seniority: str, count: int) -> Tuple[str, int]:
+    """Validate a seniority rule level and clamp its count at zero."""
+    seniority = (required_seniority or "").strip().lower()
+    if seniority not in VALID_SENIORITY_LEVELS:
+        raise ValueError("Geçersiz kıdem seviyesi.")
+    try:
+        normalized_count = int(count)
+    except (TypeError, ValueError) as exc:  # pragma: no cover - defensive parsing
+        raise ValueError("Geçersiz adet değeri.") from exc
+    return seniority, max(0, normalized_count)
 
 
 def add_clinic_seniority_rule(
@@ -1114,31 +1512,44 @@ def add_clinic_seniority_rule(
     unit_id: int,
 ) -> int:
     """Insert a seniority rule for a clinic."""
-    seniority = (required_seniority or "").strip().lower()
-    if seniority not in {"comez", "ara", "kidemli"}:
-        raise ValueError("Geçersiz kıdem seviyesi.")
-    try:
-        normalized_count = int(count)
-    except (TypeError, ValueError) as exc:  # pragma: no cover - defensive parsing
-        raise ValueError("Geçersiz adet değeri.") from exc
-    normalized_count = max(0, normalized_count)
+    seniority, normalized_count = _normalize_seniority_rule(required_seniority, count)
     with get_connection() as conn:
-        clinic_row = conn.execute(
-            "SELECT 1 FROM clinics WHERE id = ? AND unit_id = ?",
-            (clinic_id, unit_id),
-        ).fetchone()
-        if not clinic_row:
-            raise ValueError("Klinik bu tenant için bulunamadı.")
-        cursor = conn.execute(
+        rule_id = _insert_returning_id(
+            conn,
             """
             INSERT INTO clinic_seniority_rules (clinic_id, required_seniority, required_count, unit_id)
-            VALUES (?, ?, ?, ?)
+            SELECT ?, ?, ?, ?
+            WHERE EXISTS (SELECT 1 FROM clinics WHERE id = ? AND unit_id = ?)
             ON CONFLICT(clinic_id, required_seniority) DO UPDATE SET required_count=excluded.required_count
             """,
-            (clinic_id, seniority, normalized_count, unit_id),
+            (clinic_id, seniority, normalized_count, unit_id, clinic_id, unit_id),
         )
-        conn.commit()
-        return cursor.lastrowid
+        if rule_id is None:
+            raise ValueError("Klinik bu tenant için bulunamadı.")
+        return rule_id
+
+
+def add_clinic_seniority_rule_many(
+    rules: Iterable[Tuple[int, str, int]],
+    *,
+    unit_id: int,
+) -> int:
+    """Upsert several ``(clinic_id, required_seniority, count)`` rules in one transaction."""
+    values = [
+        (clinic_id, *_normalize_seniority_rule(required_seniority, count), unit_id)
+        for clinic_id, required_seniority, count in rules
+    ]
+    if not values:
+        return 0
+    with get_connection() as conn:
+        clinic_ids = {
+            row["id"]
+            for row in conn.execute("SELECT id FROM clinics WHERE unit_id = ?", (unit_id,)).fetchall()
+        }
+        if any(clinic_id not in clinic_ids for clinic_id, *_rest in values):
+            raise ValueError("Klinik bu tenant için bulunamadı.")
+        conn.executemany(UPSERT_CLINIC_SENIORITY_RULE_SQL, values)
+    return len(values)
 
 
 def delete_clinic_seniority_rule(rule_id: int, unit_id: int) -> None:
@@ -1148,7 +1559,6 @@ def delete_clinic_seniority_rule(rule_id: int, unit_id: int) -> None:
             "DELETE FROM clinic_seniority_rules WHERE id = ? AND unit_id = ?",
             (rule_id, unit_id),
         )
-        conn.commit()
 
 
 def delete_duty_type(duty_type_id: int, unit_id: int) -> None:
@@ -1158,14 +1568,13 @@ def delete_duty_type(duty_type_id: int, unit_id: int) -> None:
             "DELETE FROM duty_types WHERE id = ? AND unit_id = ?",
             (duty_type_id, unit_id),
         )
-        conn.commit()
 
 
 def list_duty_seniority_rules(
     unit_id: int,
     duty_type_id: Optional[int] = None,
-) -> Iterable[Mapping[str, Optional[str]]]:
-    """Fetch duty seniority rules; optionally limit to a single duty type."""
+) -> Iterator[Mapping[str, Optional[str]]]:
+    """Stream duty seniority rules, optionally limited to a single duty type; one pass only."""
     query = (
         "SELECT id, duty_type_id, required_seniority, required_count "
         "FROM duty_seniority_rules "
@@ -1176,9 +1585,7 @@ def list_duty_seniority_rules(
         query += "AND duty_type_id = ? "
         params.append(duty_type_id)
     query += "ORDER BY duty_type_id ASC, id ASC"
-    with get_connection() as conn:
-        rows = conn.execute(query, tuple(params)).fetchall()
-    return rows
+    return _stream_rows(query, tuple(params))
 
 
 def add_duty_seniority_rule(
@@ -1189,31 +1596,21 @@ def add_duty_seniority_rule(
     unit_id: int,
 ) -> int:
     """Insert a seniority rule for a duty type."""
-    seniority = (required_seniority or "").strip().lower()
-    if seniority not in {"comez", "ara", "kidemli"}:
-        raise ValueError("Geçersiz kıdem seviyesi.")
-    try:
-        normalized_count = int(count)
-    except (TypeError, ValueError) as exc:  # pragma: no cover - defensive parsing
-        raise ValueError("Geçersiz adet değeri.") from exc
-    normalized_count = max(0, normalized_count)
+    seniority, normalized_count = _normalize_seniority_rule(required_seniority, count)
     with get_connection() as conn:
-        duty_row = conn.execute(
-            "SELECT 1 FROM duty_types WHERE id = ? AND unit_id = ?",
-            (duty_type_id, unit_id),
-        ).fetchone()
-        if not duty_row:
-            raise ValueError("Nöbet türü bu tenant için bulunamadı.")
-        cursor = conn.execute(
+        rule_id = _insert_returning_id(
+            conn,
             """
             INSERT INTO duty_seniority_rules (duty_type_id, required_seniority, required_count, unit_id)
-            VALUES (?, ?, ?, ?)
+            SELECT ?, ?, ?, ?
+            WHERE EXISTS (SELECT 1 FROM duty_types WHERE id = ? AND unit_id = ?)
             ON CONFLICT(duty_type_id, required_seniority) DO UPDATE SET required_count = excluded.required_count
             """,
-            (duty_type_id, seniority, normalized_count, unit_id),
+            (duty_type_id, seniority, normalized_count, unit_id, duty_type_id, unit_id),
         )
-        conn.commit()
-        return cursor.lastrowid
+        if rule_id is None:
+            raise ValueError("Nöbet türü bu tenant için bulunamadı.")
+        return rule_id
 
 
 def delete_duty_seniority_rule(rule_id: int, unit_id: int) -> None:
@@ -1223,22 +1620,25 @@ def delete_duty_seniority_rule(rule_id: int, unit_id: int) -> None:
             "DELETE FROM duty_seniority_rules WHERE id = ? AND unit_id = ?",
             (rule_id, unit_id),
         )
-        conn.commit()
 
 
-def list_leave_requests(unit_id: int) -> Iterable[Mapping[str, Optional[str]]]:
-    """Return all leave requests ordered by start date."""
-    with get_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT id, staff_id, start_date, end_date, reason
-            FROM leave_requests
-            WHERE unit_id = ?
-            ORDER BY start_date ASC, end_date ASC, id ASC
-            """,
-            (unit_id,),
-        ).fetchall()
-    return rows
+def list_leave_requests(unit_id: int) -> Iterator[Mapping[str, Optional[str]]]:
+    """Stream all leave requests ordered by start date; the result can be iterated once."""
+    return _stream_rows(
+        """
+        SELECT id, staff_id, start_date, end_date, reason
+        FROM leave_requests
+        WHERE unit_id = ?
+        ORDER BY start_date ASC, end_date ASC, id ASC
+        """,
+        (unit_id,),
+    )
+
+
+INSERT_LEAVE_REQUEST_SQL = """
+    INSERT INTO leave_requests (staff_id, start_date, end_date, reason, unit_id)
+    VALUES (?, ?, ?, ?, ?)
+"""
 
 
 def add_leave_request(
@@ -1252,21 +1652,47 @@ def add_leave_request(
     """Insert a leave request and return its new ID."""
     normalized_reason = reason.strip() if reason and reason.strip() else None
     with get_connection() as conn:
-        staff_row = conn.execute(
-            "SELECT 1 FROM staff WHERE id = ? AND unit_id = ?",
-            (staff_id, unit_id),
-        ).fetchone()
-        if not staff_row:
-            raise ValueError("Personel bu tenant için bulunamadı.")
-        cursor = conn.execute(
+        request_id = _insert_returning_id(
+            conn,
             """
             INSERT INTO leave_requests (staff_id, start_date, end_date, reason, unit_id)
-            VALUES (?, ?, ?, ?, ?)
+            SELECT ?, ?, ?, ?, ?
+            WHERE EXISTS (SELECT 1 FROM staff WHERE id = ? AND unit_id = ?)
             """,
-            (staff_id, start_date, end_date, normalized_reason, unit_id),
+            (staff_id, start_date, end_date, normalized_reason, unit_id, staff_id, unit_id),
+        )
+        if request_id is None:
+            raise ValueError("Personel bu tenant için bulunamadı.")
+        return request_id
+
+
+def add_leave_request_many(
+    requests: Iterable[Tuple[int, str, str, Optional[str]]],
+    *,
+    unit_id: int,
+) -> int:
+    """Insert several ``(staff_id, start_date, end_date, reason)`` leave rows in one transaction."""
+    values = [
+        (
+            staff_id,
+            start_date,
+            end_date,
+            reason.strip() if reason and reason.strip() else None,
+            unit_id,
         )
-        conn.commit()
-        return cursor.lastrowid
+        for staff_id, start_date, end_date, reason in requests
+    ]
+    if not values:
+        return 0
+    with get_connection() as conn:
+        staff_ids = {
+            row["id"]
+            for row in conn.execute("SELECT id FROM staff WHERE unit_id = ?", (unit_id,)).fetchall()
+        }
+        if any(staff_id not in staff_ids for staff_id, *_rest in values):
+            raise ValueError("Personel bu tenant için bulunamadı.")
+        conn.executemany(INSERT_LEAVE_REQUEST_SQL, values)
+    return len(values)
 
 
 def delete_leave_request(request_id: int, unit_id: int) -> None:
@@ -1276,91 +1702,353 @@ def delete_leave_request(request_id: int, unit_id: int) -> None:
             "DELETE FROM leave_requests WHERE id = ? AND unit_id = ?",
             (request_id, unit_id),
         )
-        conn.commit()
 
 
-def list_assignment_history(
+if IS_POSTGRES:
+    HISTORY_SELECT_COLUMNS = (
+        "h.id, h.staff_id, h.clinic_id, h.assignment_date, h.plan_month_year, h.day_type"
+    )
+else:
+    HISTORY_SELECT_COLUMNS = (
+        "h.id, h.staff_id, h.clinic_id, "
+        "printf('%04d-%02d-%02d', h.assignment_date / 10000, h.assignment_date / 100 % 100, "
+        "h.assignment_date % 100) AS assignment_date, "
+        "printf('%04d-%02d', h.plan_month_year / 100, h.plan_month_year % 100) AS plan_month_year, "
+        "CASE h.day_type WHEN 1 THEN 'weekend' ELSE 'weekday' END AS day_type"
+    )
+
+
+def _encode_history_period(plan_month_year: str) -> Any:
+    """Return the stored form of a ``YYYY-MM`` period (``YYYYMM`` on SQLite)."""
+    if IS_POSTGRES:
+        return plan_month_year
+    return int(plan_month_year.replace("-", ""))
+
+
+def _encode_history_date(assignment_date: str) -> Any:
+    """Return the stored form of an ISO date (``YYYYMMDD`` on SQLite)."""
+    if IS_POSTGRES:
+        return assignment_date
+    return int(str(assignment_date)[:10].replace("-", ""))
+
+
+def _encode_history_day_type(day_type: str) -> Any:
+    """Return the stored form of a normalized day type."""
+    if IS_POSTGRES:
+        return day_type
+    return HISTORY_DAY_TYPE_CODES.get(day_type, HISTORY_DAY_TYPE_CODES["weekday"])
+
+
+# Stored form of each valid day type, so history writes map an entry with one lookup.
+STORED_HISTORY_DAY_TYPES = {
+    day_type: _encode_history_day_type(day_type) for day_type in HISTORY_DAY_TYPE_CODES
+}
+
+
+def _assignment_history_query(
     unit_id: int,
-    plan_month_year: Optional[str] = None,
-) -> Iterable[Mapping[str, Optional[str]]]:
-    """Return assignment history rows, optionally filtered by plan period."""
+    plan_month_year: Optional[str],
+    has_clinic: Optional[bool],
+    day_type: Optional[str],
+) -> Tuple[str, Tuple[Any, ...]]:
+    """Build the filtered assignment history SELECT and its parameters."""
     query = (
-        "SELECT id, staff_id, clinic_id, assignment_date, plan_month_year, day_type "
-        "FROM assignment_history "
-        "WHERE unit_id = ? "
+        f"SELECT {HISTORY_SELECT_COLUMNS} "
+        "FROM assignment_history AS h "
+        "WHERE h.unit_id = ? "
     )
     params: List[Any] = [unit_id]
     if plan_month_year:
-        query += "AND plan_month_year = ? "
-        params.append(plan_month_year)
-    query += "ORDER BY assignment_date ASC, clinic_id ASC, staff_id ASC, id ASC"
-    with get_connection() as conn:
-        rows = conn.execute(query, tuple(params)).fetchall()
-    return rows
+        query += "AND h.plan_month_year = ? "
+        params.append(_encode_history_period(plan_month_year))
+    if has_clinic is not None:
+        query += "AND h.clinic_id IS NOT NULL " if has_clinic else "AND h.clinic_id IS NULL "
+    if day_type:
+        query += "AND h.day_type = ? "
+        params.append(_encode_history_day_type(day_type))
+    query += "ORDER BY h.assignment_date ASC, h.clinic_id ASC, h.staff_id ASC, h.id ASC"
+    return query, tuple(params)
 
 
-def replace_assignment_history(
+def list_assignment_history(
+    unit_id: int,
+    plan_month_year: Optional[str] = None,
+    *,
+    has_clinic: Optional[bool] = None,
+    day_type: Optional[str] = None,
+) -> Iterator[Mapping[str, Optional[str]]]:
+    """Stream assignment history rows, optionally filtered by period, plan kind and day type.
+
+    ``has_clinic`` limits the rows to clinic assignments (True) or duty assignments (False).
+    The result is a one-pass stream; materialize it to iterate more than once.
+    """
+    query, params = _assignment_history_query(unit_id, plan_month_year, has_clinic, day_type)
+    return _stream_rows(query, params)
+
+
+def iter_assignment_history(
+    unit_id: int,
+    plan_month_year: Optional[str] = None,
+    *,
+    has_clinic: Optional[bool] = None,
+    day_type: Optional[str] = None,
+) -> Iterator[Tuple[Any, ...]]:
+    """Stream assignment history rows as plain tuples.
+
+    Takes the same filters as :func:`list_assignment_history` and yields
+    ``(id, staff_id, clinic_id, assignment_date, plan_month_year, day_type)`` without
+    building mapping rows or materializing the full result.
+    """
+    query, params = _assignment_history_query(unit_id, plan_month_year, has_clinic, day_type)
+    return _stream_rows(query, params, dict_rows=False)
+
+
+INSERT_ASSIGNMENT_HISTORY_SQL_PREFIX = (
+    "INSERT INTO assignment_history "
+    "(staff_id, clinic_id, assignment_date, plan_month_year, day_type, unit_id) VALUES "
+)
+
+
+ASSIGNMENT_HISTORY_INDEXES = {
+    "idx_assignment_history_unit_id": (
+        "CREATE INDEX IF NOT EXISTS idx_assignment_history_unit_id ON assignment_history(unit_id)"
+    ),
+    "idx_history_unit_plan": HISTORY_PLAN_INDEX_SQL,
+    "idx_history_staff": HISTORY_STAFF_INDEX_SQL,
+    "idx_history_clinic": HISTORY_CLINIC_INDEX_SQL,
+}
+
+
+# Rows per multi-row VALUES insert / IN (...) delete; 500 x 6 parameters stays well
+# under SQLite's bound-parameter limit.
+HISTORY_WRITE_CHUNK_ROWS = 500
+
+
+def _chunked(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    """Yield consecutive slices of ``items`` with at most ``size`` elements."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+@functools.lru_cache(maxsize=32)
+def _insert_assignment_history_sql(row_count: int) -> str:
+    """Return the multi-row history INSERT for ``row_count`` rows, built once per size."""
+    return INSERT_ASSIGNMENT_HISTORY_SQL_PREFIX + ", ".join(["(?, ?, ?, ?, ?, ?)"] * row_count)
+
+
+def _insert_assignment_history_rows(
+    conn: Any,
+    rows: Sequence[Tuple[int, Optional[int], Any, Any, Any, int]],
+) -> None:
+    """Insert history parameter tuples using chunked multi-row VALUES statements."""
+    for chunk in _chunked(rows, HISTORY_WRITE_CHUNK_ROWS):
+        conn.execute(
+            _insert_assignment_history_sql(len(chunk)),
+            [value for row in chunk for value in row],
+        )
+
+
+def _iter_assignment_history_values(
     unit_id: int,
     plan_month_year: str,
     entries: Iterable[Tuple[int, Optional[int], str, Optional[str]]],
-) -> None:
-    """Replace assignment history for a given plan period with provided entries."""
-    normalized_period = plan_month_year.strip()
-    formatted_entries: List[Tuple[int, Optional[int], str, str]] = []
+) -> Iterator[Tuple[int, Optional[int], Any, Any, Any, int]]:
+    """Yield assignment_history parameter tuples for normalized history entries."""
+    stored_period = _encode_history_period(plan_month_year)
+    stored_day_types = STORED_HISTORY_DAY_TYPES
+    stored_weekday = stored_day_types["weekday"]
     for entry in entries:
         if len(entry) == 4:
             staff_id, clinic_id, assignment_date, day_type = entry
+            # Callers almost always pass the canonical spelling; only normalize on a miss.
+            stored_day_type = stored_day_types.get(day_type)
+            if stored_day_type is None:
+                stored_day_type = stored_day_types.get(
+                    (day_type or "").strip().lower(), stored_weekday
+                )
         elif len(entry) == 3:
             staff_id, clinic_id, assignment_date = entry
-            day_type = "weekday"
+            stored_day_type = stored_weekday
         else:
             continue
-        normalized_day_type = (day_type or "").strip().lower()
-        if normalized_day_type not in {"weekday", "weekend"}:
-            normalized_day_type = "weekday"
-        formatted_entries.append(
-            (int(staff_id), clinic_id, assignment_date, normalized_day_type)
+        yield (
+            int(staff_id),
+            clinic_id,
+            _encode_history_date(assignment_date),
+            stored_period,
+            stored_day_type,
+            unit_id,
         )
 
-    with get_connection() as conn:
-        conn.execute(
-            "DELETE FROM assignment_history WHERE plan_month_year = ? AND unit_id = ?",
-            (normalized_period, unit_id),
-        )
-        if formatted_entries:
-            conn.executemany(
-                """
-                INSERT INTO assignment_history (staff_id, clinic_id, assignment_date, plan_month_year, day_type, unit_id)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                [
-                    (
-                        staff_id,
-                        clinic_id,
-                        assignment_date,
-                        normalized_period,
-                        day_type,
-                        unit_id,
-                    )
-                    for staff_id, clinic_id, assignment_date, day_type in formatted_entries
-                ],
-            )
-        conn.commit()
 
+def _replace_assignment_history_values(
+    unit_id: int,
+    plan_month_year: str,
+    values: Iterable[Tuple[int, Optional[int], Any, Any, Any, int]],
+) -> None:
+    """Make the stored rows of a plan period equal ``values`` by writing only the difference.
 
-def list_duty_types(unit_id: int) -> Iterable[Mapping[str, Optional[str]]]:
-    """Return all duty types."""
+    Stored rows that match a value tuple are kept, the rest are deleted, and value tuples
+    without a stored match are inserted.
+    """
     with get_connection() as conn:
-        rows = conn.execute(
+        _begin_write(conn)
+        stored_ids: Dict[Tuple[Any, ...], List[int]] = defaultdict(list)
+        for row in conn.execute(
             """
-            SELECT id, name, duration_hours, duty_category, required_staff_count
-            FROM duty_types
-            WHERE unit_id = ?
-            ORDER BY id ASC
+            SELECT id, staff_id, clinic_id, assignment_date, day_type
+            FROM assignment_history
+            WHERE plan_month_year = ? AND unit_id = ?
             """,
-            (unit_id,),
-        ).fetchall()
-    return rows
+            (_encode_history_period(plan_month_year), unit_id),
+        ).fetchall():
+            key = (row["staff_id"], row["clinic_id"], str(row["assignment_date"]), row["day_type"])
+            stored_ids[key].append(row["id"])
+
+        additions = []
+        for row_values in values:
+            matches = stored_ids.get((row_values[0], row_values[1], str(row_values[2]), row_values[4]))
+            if matches:
+                matches.pop()
+            else:
+                additions.append(row_values)
+        stale_ids = [row_id for ids in stored_ids.values() for row_id in ids]
+
+        for chunk in _chunked(stale_ids, HISTORY_WRITE_CHUNK_ROWS):
+            conn.execute(
+                f"DELETE FROM assignment_history WHERE id IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            )
+        _insert_assignment_history_rows(conn, additions)
+
+
+def replace_assignment_history(
+    unit_id: int,
+    plan_month_year: str,
+    entries: Iterable[Tuple[int, Optional[int], str, Optional[str]]],
+) -> None:
+    """Replace assignment history for a given plan period with provided entries.
+
+    Only the difference is written: stored rows that match an entry are kept, the rest
+    are deleted, and entries without a stored match are inserted.
+    """
+    normalized_period = plan_month_year.strip()
+    _replace_assignment_history_values(
+        unit_id,
+        normalized_period,
+        _iter_assignment_history_values(unit_id, normalized_period, entries),
+    )
+
+
+def replace_assignment_history_bulk(
+    unit_id: int,
+    plan_month_year: str,
+    entries: Iterable[Tuple[int, Optional[int], str, str]],
+) -> None:
+    """Replace a plan period's history with entries the caller has already normalized.
+
+    Same effect as :func:`replace_assignment_history`, minus the per-entry validation.
+    Every entry must be a ``(staff_id, clinic_id, iso_date, day_type)`` tuple with an int
+    ``staff_id``, an int or None ``clinic_id`` and ``day_type`` exactly ``"weekday"`` or
+    ``"weekend"``; ``plan_month_year`` must already be a stripped ``YYYY-MM``.
+    """
+    stored_period = _encode_history_period(plan_month_year)
+    stored_day_types = STORED_HISTORY_DAY_TYPES
+    _replace_assignment_history_values(
+        unit_id,
+        plan_month_year,
+        (
+            (
+                staff_id,
+                clinic_id,
+                _encode_history_date(assignment_date),
+                stored_period,
+                stored_day_types[day_type],
+                unit_id,
+            )
+            for staff_id, clinic_id, assignment_date, day_type in entries
+        ),
+    )
+
+
+def insert_assignment_history_many(
+    unit_id: int,
+    plan_month_year: str,
+    entries: Iterable[Tuple[int, Optional[int], str, Optional[str]]],
+) -> int:
+    """Append assignment history entries for a plan period in one transaction."""
+    values = list(_iter_assignment_history_values(unit_id, plan_month_year.strip(), entries))
+    if not values:
+        return 0
+    with get_connection() as conn:
+        _insert_assignment_history_rows(conn, values)
+    return len(values)
+
+
+def bulk_insert_assignment_history(
+    rows: Mapping[str, Iterable[Tuple[int, Optional[int], str, Optional[str]]]],
+    *,
+    unit_id: int,
+) -> int:
+    """Load history entries keyed by plan period, rebuilding history indexes afterwards.
+
+    Intended for imports spanning many periods: on SQLite the non-unique history indexes
+    are dropped before the insert and recreated once at the end, all in one transaction.
+    Routine monthly saves should keep using :func:`replace_assignment_history`.
+    """
+    values: List[Tuple[int, Optional[int], Any, Any, Any, int]] = []
+    for plan_month_year, entries in rows.items():
+        values.extend(_iter_assignment_history_values(unit_id, plan_month_year.strip(), entries))
+    if not values:
+        return 0
+    with get_connection() as conn:
+        if IS_POSTGRES:
+            _insert_assignment_history_rows(conn, values)
+        else:
+            # sqlite3 never opens a transaction for DDL on its own; without this BEGIN each
+            # DROP would commit immediately and a failed insert would leave the indexes gone.
+            _begin_write(conn)
+            for index_name in ASSIGNMENT_HISTORY_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+            _insert_assignment_history_rows(conn, values)
+            for statement in ASSIGNMENT_HISTORY_INDEXES.values():
+                conn.execute(statement)
+    return len(values)
+
+
+def list_duty_types(unit_id: int) -> Iterator[Mapping[str, Optional[str]]]:
+    """Stream all duty types; the result can be iterated once."""
+    return _stream_rows(
+        """
+        SELECT id, name, duration_hours, duty_category, required_staff_count
+        FROM duty_types
+        WHERE unit_id = ?
+        ORDER BY id ASC
+        """,
+        (unit_id,),
+    )
+
+
+INSERT_DUTY_TYPE_SQL = """
+    INSERT INTO duty_types (name, duration_hours, duty_category, required_staff_count, unit_id)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def _duty_type_insert_values(
+    name: str,
+    duration_hours: int,
+    duty_category: Optional[str],
+    required_staff_count: Optional[int],
+    *,
+    unit_id: int,
+) -> Tuple[Any, ...]:
+    """Normalize duty type fields into the parameter tuple for INSERT_DUTY_TYPE_SQL."""
+    normalized_category = (duty_category or DEFAULT_DUTY_CATEGORY).strip().lower()
+    if normalized_category not in VALID_DUTY_CATEGORIES:
+        normalized_category = DEFAULT_DUTY_CATEGORY
+    required = required_staff_count if required_staff_count and required_staff_count > 0 else 1
+    return (name.strip(), duration_hours, normalized_category, required, unit_id)
 
 
 def add_duty_type(
@@ -1372,17 +2060,33 @@ def add_duty_type(
     unit_id: int,
 ) -> int:
     """Insert a duty type."""
-    normalized_category = (duty_category or "nobet").strip().lower()
-    if normalized_category not in {"mesa", "nobet"}:
-        normalized_category = "nobet"
-    required = required_staff_count if required_staff_count and required_staff_count > 0 else 1
     with get_connection() as conn:
-        cursor = conn.execute(
-            """
-            INSERT INTO duty_types (name, duration_hours, duty_category, required_staff_count, unit_id)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (name.strip(), duration_hours, normalized_category, required, unit_id),
+        duty_type_id = _insert_returning_id(
+            conn,
+            INSERT_DUTY_TYPE_SQL,
+            _duty_type_insert_values(
+                name, duration_hours, duty_category, required_staff_count, unit_id=unit_id
+            ),
+        )
+        return duty_type_id
+
+
+def add_duty_type_many(rows: Iterable[Mapping[str, Any]], *, unit_id: int) -> List[int]:
+    """Insert several duty types in one transaction and return their new IDs in input order.
+
+    Each row uses the keyword names of :func:`add_duty_type`.
+    """
+    values = [
+        _duty_type_insert_values(
+            row["name"],
+            row["duration_hours"],
+            row.get("duty_category"),
+            row.get("required_staff_count"),
+            unit_id=unit_id,
         )
-        conn.commit()
-        return cursor.lastrowid
+        for row in rows
+    ]
+    if not values:
+        return []
+    with get_connection() as conn:
+        return [_insert_returning_id(conn, INSERT_DUTY_TYPE_SQL, row_values) for row_values in values]
@@ -13,9 +13,11 @@ from __future__ import annotations
 
 import calendar
 import datetime as dt
+import functools
+import os
 from collections import defaultdict
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 
 from ortools.sat.python import cp_model
 
@@ -42,6 +44,14 @@ SENIORITY_TARGETS: Dict[str, int] = {
     "uzman": 0,
 }
 
+# Solver budget: wall-clock limit per solve and an upper bound on parallel workers.
+SOLVER_TIME_LIMIT_SECONDS = 10.0
+SOLVER_MAX_WORKERS = 8
+
+# Reference point for the integer slot bounds used by the conflict sweep.
+SLOT_TIME_EPOCH = dt.datetime(1970, 1, 1)
+SECONDS_PER_DAY = 24 * 60 * 60
+
 ROTATION_PERIOD_TO_DAYS = {
     "daily": 1,
     "weekly": 7,
@@ -125,16 +135,45 @@ class SchedulingPrototype:
         weekend_history_counts: Optional[Mapping[str, int]] = None,
         leave_calendar: Optional[Mapping[str, Sequence[Tuple[dt.date, dt.date]]]] = None,
         objective_mode: str = "seniority",
+        previous_solution: Optional[Mapping[str, str]] = None,
     ):
         self.people: List[Person] = list(people)
         self.slots: List[DutySlot] = list(slots)
+        self._assistant_mask: List[bool] = [self._is_assistant(person) for person in self.people]
+        self._slot_durations: List[int] = [int(slot.duration_hours) for slot in self.slots]
+        self._slot_day_ordinals: List[int] = [slot.start.toordinal() for slot in self.slots]
+        # Slot identifiers are parsed once; entries are None for slots of the other kind.
+        self._clinic_ids: List[Optional[int]] = []
+        self._clinic_positions: List[Optional[int]] = []
+        self._duty_ids: List[Optional[int]] = []
+        for slot in self.slots:
+            clinic_id: Optional[int] = None
+            position_idx: Optional[int] = None
+            duty_id: Optional[int] = None
+            if slot.duty_type == "clinic":
+                clinic_id, position_idx = self._parse_clinic_slot_identifier(slot.identifier)
+            elif slot.duty_type == "duty":
+                duty_id = self._parse_duty_slot_identifier(slot.identifier)
+            self._clinic_ids.append(clinic_id)
+            self._clinic_positions.append(position_idx)
+            self._duty_ids.append(duty_id)
         self.rest_buffer = dt.timedelta(hours=rest_buffer_hours)
+        # Slot bounds as whole seconds from a naive epoch (not .timestamp(), which would
+        # apply local DST shifts), so the conflict sweep compares plain ints.
+        self._slot_start_s: List[int] = [int((slot.start - SLOT_TIME_EPOCH).total_seconds()) for slot in self.slots]
+        self._slot_end_s: List[int] = [int((slot.end - SLOT_TIME_EPOCH).total_seconds()) for slot in self.slots]
+        self._slot_needs_rest: List[bool] = [slot.requires_extended_rest for slot in self.slots]
+        self._rest_buffer_s = int(self.rest_buffer.total_seconds())
         self.enforce_person_limits = enforce_person_limits
-        self.weekend_slot_indices: Set[int] = {
-            idx
-            for idx, slot in enumerate(self.slots)
-            if slot.duty_type == "duty" and slot.start.weekday() >= 5
-        }
+        # Weekend duty flag per slot; the weekday comes from the cached day ordinal
+        # (ordinal 1 is a Monday), so no date objects are rebuilt.
+        self._slot_is_weekend = bytearray(
+            slot.duty_type == "duty" and (day_ordinal - 1) % 7 >= 5
+            for slot, day_ordinal in zip(self.slots, self._slot_day_ordinals)
+        )
+        self.weekend_slot_indices: FrozenSet[int] = frozenset(
+            idx for idx, is_weekend in enumerate(self._slot_is_weekend) if is_weekend
+        )
         self.weekend_slot_count = len(self.weekend_slot_indices)
         self.clinic_rotation_days: Dict[int, int] = {}
         if clinic_rotation_days:
@@ -210,20 +249,28 @@ class SchedulingPrototype:
             for identifier, windows in leave_calendar.items():
                 if not identifier:
                     continue
-                normalized_windows: List[Tuple[dt.date, dt.date]] = []
-                for window in windows or []:
-                    if not isinstance(window, tuple) or len(window) != 2:
-                        continue
-                    start_entry, end_entry = window
-                    if not isinstance(start_entry, dt.date) or not isinstance(end_entry, dt.date):
-                        continue
-                    start_date = start_entry
-                    end_date = end_entry
-                    if end_date < start_date:
-                        start_date, end_date = end_date, start_date
-                normalized_windows.append((start_date, end_date))
+                normalized_windows = [
+                    (min(start_date, end_date), max(start_date, end_date))
+                    for window in windows or []
+                    if isinstance(window, tuple) and len(window) == 2
+                    for start_date, end_date in (window,)
+                    if isinstance(start_date, dt.date) and isinstance(end_date, dt.date)
+                ]
                 if normalized_windows:
                     self.person_leave_windows[identifier] = normalized_windows
+        # Leave windows as [first day 00:00, day after the last day 00:00) in the same
+        # integer seconds as the slot bounds, so slot checks are plain int comparisons.
+        epoch_ordinal = SLOT_TIME_EPOCH.toordinal()
+        self.person_leave_windows_s: Dict[str, List[Tuple[int, int]]] = {
+            identifier: [
+                (
+                    (start_date.toordinal() - epoch_ordinal) * SECONDS_PER_DAY,
+                    (end_date.toordinal() + 1 - epoch_ordinal) * SECONDS_PER_DAY,
+                )
+                for start_date, end_date in windows
+            ]
+            for identifier, windows in self.person_leave_windows.items()
+        }
         self.weekend_history_counts: Dict[str, int] = {}
         if weekend_history_counts:
             for identifier, count in weekend_history_counts.items():
@@ -252,10 +299,18 @@ class SchedulingPrototype:
                 if normalized_people:
                     self.clinic_repeat_history[clinic_id] = normalized_people
         self.repeat_penalty_variables: List[cp_model.IntVar] = []
+        # Fallback seat vars of every seniority rule, fed straight into the objective.
         self.fallback_penalty_vars: List[cp_model.IntVar] = []
         self.fallback_penalty_weight = max(10, len(self.slots))
+        self._weekend_terms_cache: Optional[Tuple[cp_model.CpModel, Tuple[List[cp_model.IntVar], int]]] = None
         allowed_modes = {"seniority", "balanced"}
         self.objective_mode = objective_mode if objective_mode in allowed_modes else "seniority"
+        # slot identifier -> person identifier from an earlier solve, used to seed the hint.
+        self.previous_solution: Dict[str, str] = {
+            str(slot_id): str(person_id)
+            for slot_id, person_id in (previous_solution or {}).items()
+            if slot_id and person_id
+        }
         self._validate_inputs()
 
     def _validate_inputs(self) -> None:
@@ -272,25 +327,21 @@ class SchedulingPrototype:
         title = (person.title or "").strip().lower()
         return title.startswith("asst") or person.education_year is not None
 
-    def _person_on_leave_during_slot(self, person_identifier: str, slot: DutySlot) -> bool:
+    def _person_on_leave_during_slot(self, person_identifier: str, s_idx: int) -> bool:
         """Return True if the slot overlaps with a leave window for the person."""
-        windows = self.person_leave_windows.get(person_identifier)
+        windows = self.person_leave_windows_s.get(person_identifier)
         if not windows:
             return False
-        slot_start = slot.start
-        slot_end = slot.end
-        for start_date, end_date in windows:
-            leave_start = dt.datetime.combine(start_date, dt.time.min)
-            leave_end = dt.datetime.combine(end_date, dt.time.max)
-            if slot_start <= leave_end and slot_end >= leave_start:
+        slot_start = self._slot_start_s[s_idx]
+        slot_end = self._slot_end_s[s_idx]
+        for leave_start, leave_end in windows:
+            if slot_start < leave_end and slot_end >= leave_start:
                 return True
         return False
 
-    def _clinic_assignment_repeat(self, person_identifier: str, slot: DutySlot) -> bool:
+    def _clinic_assignment_repeat(self, person_identifier: str, s_idx: int) -> bool:
         """Check whether assigning this slot repeats previous clinic duty for the person."""
-        if slot.duty_type != "clinic":
-            return False
-        clinic_id, _position = self._parse_clinic_slot_identifier(slot.identifier)
+        clinic_id = self._clinic_ids[s_idx]
         if clinic_id is None:
             return False
         repeated_people = self.clinic_repeat_history.get(clinic_id)
@@ -299,33 +350,93 @@ class SchedulingPrototype:
         return person_identifier in repeated_people
 
     def _build_assignment_variables(
-        self, model: cp_model.CpModel
+        self,
+        model: cp_model.CpModel,
+        slot_aliases: Optional[Mapping[int, int]] = None,
     ) -> Dict[Tuple[int, int], cp_model.IntVar]:
-        """Creates boolean variables for eligible person-slot pairs."""
+        """Creates boolean variables for eligible person-slot pairs.
+
+        ``slot_aliases`` maps a clinic slot to its rotation block representative. A person
+        eligible for both slots gets the representative's variable for the aliased slot
+        too, instead of a second variable tied to it by an equality constraint.
+        """
+        slot_aliases = slot_aliases or {}
         assignment_vars: Dict[Tuple[int, int], cp_model.IntVar] = {}
+        # Per-person views filled alongside the dict, so totals need no P x S probing.
+        self.person_assignment_vars: List[List[Tuple[int, cp_model.IntVar]]] = []
+        self.person_weekend_vars: List[List[cp_model.IntVar]] = []
+        self.slot_candidate_vars: List[List[cp_model.IntVar]] = [[] for _ in self.slots]
+        # (p_idx, var, seniority, is_assistant) per candidate, for the seniority rules.
+        self.slot_person_entries: List[List[Tuple[int, cp_model.IntVar, str, bool]]] = [[] for _ in self.slots]
+        # Dense [P][S] view (None where ineligible) for indexed access without tuple keys.
+        self.assignment_grid: List[List[Optional[cp_model.IntVar]]] = [
+            [None] * len(self.slots) for _ in self.people
+        ]
+        slot_candidate_vars = self.slot_candidate_vars
+        slot_person_entries = self.slot_person_entries
+        slot_is_weekend = self._slot_is_weekend
+        # Per-slot clinic facts do not depend on the person; resolve them once up front.
+        # Each entry is None for non-clinic slots, else (allow_specialist, forbidden_people).
+        clinic_slot_filters: List[Optional[Tuple[bool, Set[str]]]] = []
+        for slot, clinic_id in zip(self.slots, self._clinic_ids):
+            if slot.duty_type != "clinic":
+                clinic_slot_filters.append(None)
+                continue
+            if clinic_id is None:
+                clinic_slot_filters.append((False, set()))
+                continue
+            rules = self.clinic_seniority_rules.get(clinic_id, {})
+            clinic_slot_filters.append(
+                (bool(rules.get("uzman")), self.clinic_forbidden_people.get(clinic_id) or set())
+            )
         for p_idx, person in enumerate(self.people):
+            allowed = person.allowed_duty_types
+            allows_any_duty = "*" in allowed
+            is_assistant = self._assistant_mask[p_idx]
+            seniority = person.seniority
+            person_row = self.assignment_grid[p_idx]
+            person_vars: List[Tuple[int, cp_model.IntVar]] = []
+            # Aliased slots are resolved after the loop, once their representative exists.
+            aliased_slots: List[int] = []
             for s_idx, slot in enumerate(self.slots):
-                allowed = person.allowed_duty_types
-                if "*" not in allowed and slot.duty_type not in allowed:
+                if not allows_any_duty and slot.duty_type not in allowed:
                     continue
-                if slot.duty_type == "clinic":
-                    clinic_id, _position = self._parse_clinic_slot_identifier(slot.identifier)
-                    allow_specialist = False
-                    if clinic_id is not None:
-                        rules = self.clinic_seniority_rules.get(clinic_id, {})
-                        allow_specialist = bool(rules.get("uzman"))
-                        forbidden_people = self.clinic_forbidden_people.get(clinic_id)
-                        if forbidden_people and person.identifier in forbidden_people:
-                            continue
-                    if not allow_specialist and not self._is_assistant(person):
+                clinic_filter = clinic_slot_filters[s_idx]
+                if clinic_filter is not None:
+                    allow_specialist, forbidden_people = clinic_filter
+                    if person.identifier in forbidden_people:
                         continue
-                if self._person_on_leave_during_slot(person.identifier, slot):
+                    if not allow_specialist and not is_assistant:
+                        continue
+                if self._person_on_leave_during_slot(person.identifier, s_idx):
+                    continue
+                if s_idx in slot_aliases:
+                    aliased_slots.append(s_idx)
                     continue
                 var_name = f"assign_p{p_idx}_s{s_idx}"
                 var = model.NewBoolVar(var_name)
                 assignment_vars[(p_idx, s_idx)] = var
-                if self._clinic_assignment_repeat(person.identifier, slot):
+                person_row[s_idx] = var
+                person_vars.append((s_idx, var))
+                slot_candidate_vars[s_idx].append(var)
+                slot_person_entries[s_idx].append((p_idx, var, seniority, is_assistant))
+                if self._clinic_assignment_repeat(person.identifier, s_idx):
+                    self.repeat_penalty_variables.append(var)
+            for s_idx in aliased_slots:
+                var = person_row[slot_aliases[s_idx]]
+                if var is None:
+                    var = model.NewBoolVar(f"assign_p{p_idx}_s{s_idx}")
+                assignment_vars[(p_idx, s_idx)] = var
+                person_row[s_idx] = var
+                person_vars.append((s_idx, var))
+                slot_candidate_vars[s_idx].append(var)
+                slot_person_entries[s_idx].append((p_idx, var, seniority, is_assistant))
+                if self._clinic_assignment_repeat(person.identifier, s_idx):
                     self.repeat_penalty_variables.append(var)
+            self.person_assignment_vars.append(person_vars)
+            self.person_weekend_vars.append(
+                [var for s_idx, var in person_vars if slot_is_weekend[s_idx]]
+            )
         return assignment_vars
 
     def _build_person_totals(
@@ -335,16 +446,13 @@ class SchedulingPrototype:
     ) -> Tuple[List[cp_model.IntVar], List[cp_model.IntVar], List[cp_model.IntVar], int, int]:
         """Create helper variables that track per-person slot counts and total hours."""
         total_slots = len(self.slots)
-        total_hours = sum(int(slot.duration_hours) for slot in self.slots)
+        slot_durations = self._slot_durations
+        total_hours = sum(slot_durations)
         load_vars: List[cp_model.IntVar] = []
         hour_vars: List[cp_model.IntVar] = []
         weekend_vars: List[cp_model.IntVar] = []
         for p_idx in range(len(self.people)):
-            paired_assignments = [
-                (s_idx, assignment_vars[(p_idx, s_idx)])
-                for s_idx in range(total_slots)
-                if (p_idx, s_idx) in assignment_vars
-            ]
+            paired_assignments = self.person_assignment_vars[p_idx]
             load_var = model.NewIntVar(0, total_slots, f"load_p{p_idx}")
             if paired_assignments:
                 model.Add(load_var == sum(var for _idx, var in paired_assignments))
@@ -357,9 +465,9 @@ class SchedulingPrototype:
             if paired_assignments:
                 model.Add(
                     hour_var
-                    == sum(
-                        int(self.slots[s_idx].duration_hours) * var
-                        for s_idx, var in paired_assignments
+                    == cp_model.LinearExpr.WeightedSum(
+                        [var for _idx, var in paired_assignments],
+                        [slot_durations[s_idx] for s_idx, _var in paired_assignments],
                     )
                 )
             else:
@@ -367,15 +475,9 @@ class SchedulingPrototype:
             hour_vars.append(hour_var)
             weekend_upper = self.weekend_slot_count
             weekend_var = model.NewIntVar(0, weekend_upper, f"weekend_p{p_idx}")
-            if paired_assignments and self.weekend_slot_indices:
-                model.Add(
-                    weekend_var
-                    == sum(
-                        var
-                        for s_idx, var in paired_assignments
-                        if s_idx in self.weekend_slot_indices
-                    )
-                )
+            person_weekend_vars = self.person_weekend_vars[p_idx]
+            if person_weekend_vars:
+                model.Add(weekend_var == cp_model.LinearExpr.Sum(person_weekend_vars))
             else:
                 model.Add(weekend_var == 0)
             weekend_vars.append(weekend_var)
@@ -387,18 +489,13 @@ class SchedulingPrototype:
         assignment_vars: Dict[Tuple[int, int], cp_model.IntVar],
     ) -> None:
         """Every slot must be filled by exactly one eligible person."""
-        for s_idx, _slot in enumerate(self.slots):
-            candidate_vars = [
-                assignment_vars[(p_idx, s_idx)]
-                for p_idx in range(len(self.people))
-                if (p_idx, s_idx) in assignment_vars
-            ]
+        for s_idx, candidate_vars in enumerate(self.slot_candidate_vars):
             if not candidate_vars:
                 raise ValueError(
                     f"No eligible personnel found for slot '{self.slots[s_idx].identifier}'. "
                     "Adjust allowed duty types to make the problem feasible."
                 )
-            model.Add(sum(candidate_vars) == 1)
+            model.AddExactlyOne(candidate_vars)
 
     @staticmethod
     def _parse_clinic_slot_identifier(identifier: str) -> Tuple[Optional[int], Optional[int]]:
@@ -421,23 +518,6 @@ class SchedulingPrototype:
             position_idx = 1
         return clinic_id, position_idx
 
-    def _collect_clinic_slot_groups(self) -> Dict[int, Dict[int, List[Tuple[int, DutySlot]]]]:
-        """Group clinic slots by clinic id and assistant position index."""
-        groups: Dict[int, Dict[int, List[Tuple[int, DutySlot]]]] = {}
-        for s_idx, slot in enumerate(self.slots):
-            if slot.duty_type != "clinic":
-                continue
-            clinic_id, position_idx = self._parse_clinic_slot_identifier(slot.identifier)
-            if clinic_id is None or position_idx is None:
-                continue
-            position_map = groups.setdefault(clinic_id, {})
-            position_map.setdefault(position_idx, []).append((s_idx, slot))
-
-        for position_map in groups.values():
-            for slot_list in position_map.values():
-                slot_list.sort(key=lambda item: item[1].start)
-        return groups
-
     @staticmethod
     def _parse_duty_slot_identifier(identifier: str) -> Optional[int]:
         """Extract duty type id from duty slot identifiers."""
@@ -452,106 +532,109 @@ class SchedulingPrototype:
             return None
         return duty_id
 
-    def _collect_duty_slot_groups(self) -> Dict[int, Dict[str, List[int]]]:
-        """Group duty slots by duty type and calendar day."""
-        groups: Dict[int, Dict[str, List[int]]] = {}
-        for s_idx, slot in enumerate(self.slots):
-            if slot.duty_type != "duty":
-                continue
-            duty_id = self._parse_duty_slot_identifier(slot.identifier)
+    def _collect_duty_slot_groups(self) -> Dict[int, Dict[int, List[int]]]:
+        """Group duty slots by duty type and calendar day (keyed by date ordinal)."""
+        groups: Dict[int, Dict[int, List[int]]] = {}
+        for s_idx, (duty_id, date_key) in enumerate(zip(self._duty_ids, self._slot_day_ordinals)):
             if duty_id is None:
                 continue
-            date_key = slot.start.date().isoformat()
             date_map = groups.setdefault(duty_id, {})
             date_map.setdefault(date_key, []).append(s_idx)
         return groups
 
 
+    def _collect_clinic_rotation_blocks(self) -> Dict[int, Dict[int, List[List[int]]]]:
+        """Split each clinic position's slots into rotation blocks.
+
+        Returns ``clinic_id -> block_key -> [slot indices of one position]``, each list in
+        start order so its first slot is the block representative.
+        """
+        if not self.clinic_rotation_days and not self.clinic_seniority_rules:
+            # No additional constraints defined.
+            return {}
+
+        clinic_ids = self._clinic_ids
+        positions = self._clinic_positions
+        day_ordinals = self._slot_day_ordinals
+        # Anchor each clinic's rotation windows at its earliest slot date.
+        base_ordinals: Dict[int, int] = {}
+        for clinic_id, day_ordinal in zip(clinic_ids, day_ordinals):
+            if clinic_id is not None and day_ordinal < base_ordinals.get(clinic_id, day_ordinal + 1):
+                base_ordinals[clinic_id] = day_ordinal
+
+        # One pass buckets every clinic slot by (clinic, position, block).
+        buckets: Dict[Tuple[int, int, int], List[int]] = defaultdict(list)
+        for s_idx, clinic_id in enumerate(clinic_ids):
+            position_idx = positions[s_idx]
+            if clinic_id is None or position_idx is None:
+                continue
+            rotation_days = self.clinic_rotation_days.get(clinic_id, 1)
+            if rotation_days <= 0:
+                block_key = 0
+            else:
+                block_key = (day_ordinals[s_idx] - base_ordinals[clinic_id]) // rotation_days
+            buckets[(clinic_id, position_idx, block_key)].append(s_idx)
+
+        slots = self.slots
+        rotation_blocks: Dict[int, Dict[int, List[List[int]]]] = {}
+        for (clinic_id, _position_idx, block_key), slot_indices in buckets.items():
+            # Start order (ties by index) makes the representative choice deterministic.
+            slot_indices.sort(key=lambda idx: (slots[idx].start, idx))
+            clinic_blocks = rotation_blocks.setdefault(clinic_id, {})
+            clinic_blocks.setdefault(block_key, []).append(slot_indices)
+        return rotation_blocks
+
+    @staticmethod
+    def _rotation_slot_aliases(
+        rotation_blocks: Mapping[int, Mapping[int, Sequence[Sequence[int]]]],
+    ) -> Dict[int, int]:
+        """Map every non-representative slot of a rotation block to its representative."""
+        aliases: Dict[int, int] = {}
+        for clinic_blocks in rotation_blocks.values():
+            for position_blocks in clinic_blocks.values():
+                for slot_indices in position_blocks:
+                    representative_idx = slot_indices[0]
+                    for s_idx in slot_indices[1:]:
+                        aliases[s_idx] = representative_idx
+        return aliases
+
     def _enforce_clinic_rotation_and_seniority(
         self,
         model: cp_model.CpModel,
         assignment_vars: Dict[Tuple[int, int], cp_model.IntVar],
+        rotation_blocks: Mapping[int, Mapping[int, Sequence[Sequence[int]]]],
     ) -> None:
-        """Ensure clinic slots follow rotation periods and honour seniority counts."""
-        if not self.clinic_rotation_days and not self.clinic_seniority_rules:
-            # No additional constraints defined.
-            return
-
-        grouped_slots = self._collect_clinic_slot_groups()
-        if not grouped_slots:
-            return
+        """Honour clinic seniority counts per rotation block.
 
-        for clinic_id, position_map in grouped_slots.items():
-            rotation_days = self.clinic_rotation_days.get(clinic_id, 1)
+        Rotation itself needs no constraints here: slots after a block's representative
+        share its assignment variables (see ``_build_assignment_variables``).
+        """
+        for clinic_id, clinic_blocks in rotation_blocks.items():
             clinic_rules = self.clinic_seniority_rules.get(clinic_id, {})
-            # Determine the earliest slot date for this clinic to anchor rotation windows.
-            base_date: Optional[dt.date] = None
-            for slot_list in position_map.values():
-                for _, slot in slot_list:
-                    slot_date = slot.start.date()
-                    if base_date is None or slot_date < base_date:
-                        base_date = slot_date
-            if base_date is None:
-                continue
-
-            block_representatives: Dict[int, List[int]] = defaultdict(list)
-
-            for slot_list in position_map.values():
-                if not slot_list:
-                    continue
-                blocks: Dict[int, List[Tuple[int, DutySlot]]] = defaultdict(list)
-                for s_idx, slot in slot_list:
-                    if rotation_days <= 0:
-                        block_key = 0
-                    else:
-                        delta_days = (slot.start.date() - base_date).days
-                        block_key = delta_days // rotation_days
-                    blocks[block_key].append((s_idx, slot))
-
-                for block_key, grouped in blocks.items():
-                    # Keep original order to maintain deterministic representative selection.
-                    grouped.sort(key=lambda item: item[1].start)
-                    representative_idx = grouped[0][0]
-                    block_representatives[block_key].append(representative_idx)
-                    for s_idx, _slot in grouped[1:]:
-                        for p_idx in range(len(self.people)):
-                            var_ref = assignment_vars.get((p_idx, representative_idx))
-                            var_other = assignment_vars.get((p_idx, s_idx))
-                            if var_ref is None or var_other is None:
-                                continue
-                            model.Add(var_other == var_ref)
-
             if not clinic_rules:
                 continue
 
-            for block_key, representative_indices in block_representatives.items():
-                if not representative_indices:
-                    continue
+            for block_key, position_blocks in clinic_blocks.items():
+                representative_indices = [slot_indices[0] for slot_indices in position_blocks]
                 for seniority_key, required_count in clinic_rules.items():
                     if required_count <= 0:
                         continue
                     exact_vars: List[cp_model.IntVar] = []
                     fallback_vars: List[cp_model.IntVar] = []
                     for rep_idx in representative_indices:
-                        for p_idx, person in enumerate(self.people):
-                            var = assignment_vars.get((p_idx, rep_idx))
-                            if var is None:
-                                continue
-                            if person.seniority == seniority_key:
+                        for _p_idx, var, seniority, is_assistant in self.slot_person_entries[rep_idx]:
+                            if seniority == seniority_key:
                                 exact_vars.append(var)
-                            elif self._is_assistant(person):
+                            elif is_assistant:
                                 fallback_vars.append(var)
                     if not exact_vars and not fallback_vars:
                         model.Add(0 == required_count)
                         continue
-                    total_vars = exact_vars + fallback_vars
-                    model.Add(cp_model.LinearExpr.Sum(total_vars) == required_count)
-                    fallback_usage = model.NewIntVar(0, required_count, f"fallback_clinic_{clinic_id}_{block_key}_{seniority_key}")
                     model.Add(
-                        fallback_usage
-                        == required_count - cp_model.LinearExpr.Sum(exact_vars)
+                        cp_model.LinearExpr.Sum(exact_vars) + cp_model.LinearExpr.Sum(fallback_vars)
+                        == required_count
                     )
-                    self.fallback_penalty_vars.append(fallback_usage)
+                    self.fallback_penalty_vars.extend(fallback_vars)
 
     def _enforce_duty_seniority_rules(
         self,
@@ -579,43 +662,32 @@ class SchedulingPrototype:
                     exact_vars: List[cp_model.IntVar] = []
                     fallback_vars: List[cp_model.IntVar] = []
                     for s_idx in slot_indices:
-                        for p_idx, person in enumerate(self.people):
-                            var = assignment_vars.get((p_idx, s_idx))
-                            if var is None:
-                                continue
-                            if person.seniority == seniority_key:
+                        for _p_idx, var, seniority, is_assistant in self.slot_person_entries[s_idx]:
+                            if seniority == seniority_key:
                                 exact_vars.append(var)
-                            elif self._is_assistant(person):
+                            elif is_assistant:
                                 fallback_vars.append(var)
                     if not exact_vars and not fallback_vars:
                         model.Add(0 == required_count)
                         continue
-                    total_vars = exact_vars + fallback_vars
-                    model.Add(cp_model.LinearExpr.Sum(total_vars) == required_count)
-                    fallback_usage = model.NewIntVar(
-                        0,
-                        required_count,
-                        f"fallback_duty_{duty_id}_{date_key}_{seniority_key}",
-                    )
                     model.Add(
-                        fallback_usage
-                        == required_count - cp_model.LinearExpr.Sum(exact_vars)
+                        cp_model.LinearExpr.Sum(exact_vars) + cp_model.LinearExpr.Sum(fallback_vars)
+                        == required_count
                     )
-                    self.fallback_penalty_vars.append(fallback_usage)
+                    self.fallback_penalty_vars.extend(fallback_vars)
 
     def _enforce_non_overlap_and_rest(
         self,
         model: cp_model.CpModel,
         assignment_vars: Dict[Tuple[int, int], cp_model.IntVar],
+        conflict_cliques: Sequence[Sequence[int]],
     ) -> None:
         """Prevent assigning conflicting duties to the same person."""
-        slot_pairs = self._compute_conflicting_slot_pairs()
-        for p_idx, _person in enumerate(self.people):
-            for s_a, s_b in slot_pairs:
-                var_a = assignment_vars.get((p_idx, s_a))
-                var_b = assignment_vars.get((p_idx, s_b))
-                if var_a is not None and var_b is not None:
-                    model.Add(var_a + var_b <= 1)
+        for person_row in self.assignment_grid:
+            for clique in conflict_cliques:
+                clique_vars = [person_row[s_idx] for s_idx in clique if person_row[s_idx] is not None]
+                if len(clique_vars) > 1:
+                    model.AddAtMostOne(clique_vars)
 
     def _enforce_person_limits(
         self,
@@ -625,13 +697,8 @@ class SchedulingPrototype:
         """Apply per-person minimum/maximum assignment limits if configured."""
         if not self.enforce_person_limits:
             return
-        total_slots = len(self.slots)
-        for p_idx, person in enumerate(self.people):
-            person_vars = [
-                assignment_vars[(p_idx, s_idx)]
-                for s_idx in range(total_slots)
-                if (p_idx, s_idx) in assignment_vars
-            ]
+        for person, paired_assignments in zip(self.people, self.person_assignment_vars):
+            person_vars = [var for _s_idx, var in paired_assignments]
             if not person_vars:
                 continue
             if person.min_night_duties is not None:
@@ -639,30 +706,118 @@ class SchedulingPrototype:
             if person.max_night_duties is not None:
                 model.Add(sum(person_vars) <= max(person.max_night_duties, 0))
 
-    def _compute_conflicting_slot_pairs(self) -> List[Tuple[int, int]]:
-        """Pre-compute all slot index pairs that cannot be held by one person."""
-        conflicting_pairs: List[Tuple[int, int]] = []
-        for i, slot_a in enumerate(self.slots):
-            for j in range(i + 1, len(self.slots)):
-                slot_b = self.slots[j]
-                if self._slots_overlap(slot_a, slot_b) or self._violates_rest(slot_a, slot_b):
-                    conflicting_pairs.append((i, j))
-        return conflicting_pairs
-
-    def _slots_overlap(self, slot_a: DutySlot, slot_b: DutySlot) -> bool:
-        latest_start = max(slot_a.start, slot_b.start)
-        earliest_end = min(slot_a.end, slot_b.end)
-        return latest_start < earliest_end
-
-    def _violates_rest(self, slot_a: DutySlot, slot_b: DutySlot) -> bool:
-        """Checks the 48-hour rest rule for overnight/full duties."""
-        if not (slot_a.requires_extended_rest and slot_b.requires_extended_rest):
-            return False
+    def _add_greedy_hint(
+        self,
+        model: cp_model.CpModel,
+        conflict_cliques: Sequence[Sequence[int]],
+    ) -> None:
+        """Warm-start the search with a cheap greedy schedule.
+
+        Assignments from ``previous_solution`` that still fit are placed first. Remaining
+        slots with the fewest candidates are filled next, each by the candidate furthest
+        below target (raw load in balanced mode, load minus the seniority target
+        otherwise) with no overlap/rest conflict against their earlier picks. Slots
+        sharing one variable (rotation aliases) are placed together. Seniority rules are
+        ignored, so the hint may be partial or infeasible; CP-SAT only uses it as a guide.
+        """
+        conflicts: List[Set[int]] = [set() for _ in self.slots]
+        for clique in conflict_cliques:
+            for s_idx in clique:
+                conflicts[s_idx].update(clique)
+
+        # Slots behind each distinct variable of a person (more than one for rotation aliases).
+        var_slots: List[Dict[int, List[int]]] = []
+        for person_vars in self.person_assignment_vars:
+            slots_by_var: Dict[int, List[int]] = defaultdict(list)
+            for s_idx, var in person_vars:
+                slots_by_var[var.Index()].append(s_idx)
+            var_slots.append(slots_by_var)
+
+        assigned_to: Dict[int, int] = {}
+        busy: List[Set[int]] = [set() for _ in self.people]
+        if self.objective_mode == "balanced":
+            loads = [0] * len(self.people)
+        else:
+            loads = [-person.preferred_load() for person in self.people]
+
+        def place(p_idx: int, var: cp_model.IntVar) -> bool:
+            group = var_slots[p_idx][var.Index()]
+            person_busy = busy[p_idx]
+            if any(idx in assigned_to or conflicts[idx] & person_busy for idx in group):
+                return False
+            for idx in group:
+                assigned_to[idx] = p_idx
+            person_busy.update(group)
+            loads[p_idx] += len(group)
+            return True
+
+        if self.previous_solution:
+            person_indices = {person.identifier: p_idx for p_idx, person in enumerate(self.people)}
+            for s_idx, slot in enumerate(self.slots):
+                previous_idx = person_indices.get(self.previous_solution.get(slot.identifier, ""))
+                if previous_idx is None or s_idx in assigned_to:
+                    continue
+                for p_idx, var, _seniority, _is_assistant in self.slot_person_entries[s_idx]:
+                    if p_idx == previous_idx:
+                        place(p_idx, var)
+                        break
+
+        order = sorted(range(len(self.slots)), key=lambda idx: (len(self.slot_candidate_vars[idx]), idx))
+        for s_idx in order:
+            if s_idx in assigned_to:
+                continue
+            candidates = sorted(self.slot_person_entries[s_idx], key=lambda entry: (loads[entry[0]], entry[0]))
+            for p_idx, var, _seniority, _is_assistant in candidates:
+                if place(p_idx, var):
+                    break
 
-        # Order slots chronologically.
-        earlier, later = sorted((slot_a, slot_b), key=lambda x: x.start)
-        rest_window_end = earlier.end + self.rest_buffer
-        return later.start < rest_window_end
+        hinted: Set[int] = set()
+        for p_idx, person_vars in enumerate(self.person_assignment_vars):
+            for s_idx, var in person_vars:
+                if var.Index() in hinted:
+                    continue
+                hinted.add(var.Index())
+                model.AddHint(var, int(assigned_to.get(s_idx) == p_idx))
+
+    def _compute_conflict_cliques(self) -> List[List[int]]:
+        """Pre-compute groups of slots that pairwise cannot be held by one person.
+
+        Overlap and rest conflicts are each swept in start order (ties broken by slot
+        index) on the integer second bounds. A slot conflicts with every earlier
+        slot still "reaching" its start, so the reaching slots plus the new one always
+        form a clique; a clique is emitted once the next slot can no longer extend it.
+        Every conflicting pair lies in at least one emitted clique.
+        """
+        starts = self._slot_start_s
+        ends = self._slot_end_s
+        needs_rest = self._slot_needs_rest
+        rest_s = self._rest_buffer_s
+        order = sorted(range(len(starts)), key=lambda idx: (starts[idx], idx))
+        overlap_reach = {idx: ends[idx] for idx in order if starts[idx] < ends[idx]}
+        rest_reach = {idx: ends[idx] + rest_s for idx in order if needs_rest[idx]}
+        # Among rest-bound slots an overlap is already a rest conflict (for a non-negative buffer).
+        rest_covers_overlap = rest_s >= 0
+
+        cliques: List[List[int]] = []
+        for reach, is_rest_sweep in ((overlap_reach, False), (rest_reach, True)):
+            active: List[int] = []
+            pending: List[int] = []
+            for idx in order:
+                if idx not in reach:
+                    continue
+                start = starts[idx]
+                still_active = [other for other in active if start < reach[other]]
+                if len(still_active) < len(active):
+                    # Something dropped out, so the pending clique is maximal.
+                    cliques.append(pending)
+                    pending = []
+                active = still_active
+                active.append(idx)
+                pending = list(active)
+            cliques.append(pending)
+            if not is_rest_sweep and rest_covers_overlap:
+                cliques = [clique for clique in cliques if not all(needs_rest[idx] for idx in clique)]
+        return [sorted(clique) for clique in cliques if len(clique) > 1]
 
     def _add_seniority_objective(
         self,
@@ -672,34 +827,23 @@ class SchedulingPrototype:
         total_slots: int,
     ) -> None:
         """Softly steer towards seniority-driven workloads via absolute deviation."""
-        objective_terms: List[cp_model.IntVar] = []
+        objective_vars: List[cp_model.IntVar] = []
+        objective_coeffs: List[int] = []
 
         for p_idx, person in enumerate(self.people):
-            load = load_vars[p_idx]
-            preferred = person.preferred_load()
-            diff = model.NewIntVar(-total_slots, total_slots, f"seniority_diff_p{p_idx}")
-            model.Add(diff == load - preferred)
-
-            abs_diff = model.NewIntVar(0, total_slots, f"seniority_abs_diff_p{p_idx}")
-            model.AddAbsEquality(abs_diff, diff)
-
             weight = person.weight()
-            weighted_deviation = model.NewIntVar(0, total_slots * weight, f"seniority_weighted_diff_p{p_idx}")
-            model.Add(weighted_deviation == abs_diff * weight)
-            objective_terms.append(weighted_deviation)
+            if weight == 0:
+                # Zero-weight people (e.g. specialists) never move the objective.
+                continue
+            preferred = person.preferred_load()
+            # The deviation can reach the target itself when fewer slots than that exist.
+            abs_diff = model.NewIntVar(0, max(total_slots, preferred), f"seniority_abs_diff_p{p_idx}")
+            model.AddAbsEquality(abs_diff, load_vars[p_idx] - preferred)
+            objective_vars.append(abs_diff)
+            objective_coeffs.append(weight)
 
         weekend_terms = self._build_weekend_fairness_terms(model, weekend_vars)
-        objective_expr = cp_model.LinearExpr.Sum(
-            [term for term in objective_terms]
-            + [self.weekend_penalty_weight * term for term in weekend_terms]
-        ) if (objective_terms or weekend_terms) else 0
-        if self.fallback_penalty_vars:
-            fallback_expr = cp_model.LinearExpr.Sum(self.fallback_penalty_vars)
-            objective_expr = objective_expr + self.fallback_penalty_weight * fallback_expr
-        if self.repeat_penalty_variables:
-            penalty_expr = cp_model.LinearExpr.Sum(self.repeat_penalty_variables)
-            objective_expr = objective_expr + self.repeat_penalty_weight * penalty_expr
-        model.Minimize(objective_expr)
+        self._minimize_with_penalties(model, objective_vars, objective_coeffs, weekend_terms)
 
     def _add_balanced_objective(
         self,
@@ -726,51 +870,85 @@ class SchedulingPrototype:
         slot_bound = total_slots * num_people
         hour_bound = total_hours * max(1, num_people)
 
-        for p_idx in range(num_people):
+        count_weight = max(1, average_duration)
+        # With one shared slot length d (= count_weight), hours are d * load, so the hour
+        # deviation equals count_weight * the slot deviation; one term at weight 2 suffices.
+        uniform_duration = len(set(self._slot_durations)) == 1 and self._slot_durations[0] == count_weight
+
+        # A lone person holds every slot, so both deviations are structurally zero.
+        for p_idx in range(num_people if num_people > 1 else 0):
             load_var = load_vars[p_idx]
             hour_var = hour_vars[p_idx]
 
-            slot_diff = model.NewIntVar(-slot_bound, slot_bound, f"balanced_slot_diff_p{p_idx}")
-            model.Add(slot_diff == load_var * num_people - total_slots)
-            slot_abs = model.NewIntVar(0, slot_bound, f"balanced_slot_abs_p{p_idx}")
-            model.AddAbsEquality(slot_abs, slot_diff)
-            abs_slot_terms.append(slot_abs)
+            if not uniform_duration:
+                slot_abs = model.NewIntVar(0, slot_bound, f"balanced_slot_abs_p{p_idx}")
+                model.AddAbsEquality(slot_abs, load_var * num_people - total_slots)
+                abs_slot_terms.append(slot_abs)
 
-            hour_diff = model.NewIntVar(-hour_bound, hour_bound, f"balanced_hour_diff_p{p_idx}")
-            model.Add(hour_diff == hour_var * num_people - total_hours)
             hour_abs = model.NewIntVar(0, hour_bound, f"balanced_hour_abs_p{p_idx}")
-            model.AddAbsEquality(hour_abs, hour_diff)
+            model.AddAbsEquality(hour_abs, hour_var * num_people - total_hours)
             abs_hour_terms.append(hour_abs)
 
-        objective_expr: List[cp_model.IntVar] = []
-        count_weight = max(1, average_duration)
-        for term in abs_slot_terms:
-            objective_expr.append(count_weight * term)
-        objective_expr.extend(abs_hour_terms)
+        hour_weight = 2 if uniform_duration else 1
+        objective_vars = abs_slot_terms + abs_hour_terms
+        objective_coeffs = [count_weight] * len(abs_slot_terms) + [hour_weight] * len(abs_hour_terms)
         weekend_terms = self._build_weekend_fairness_terms(model, weekend_vars)
-        objective_sum = cp_model.LinearExpr.Sum(
-            [expr for expr in objective_expr]
-            + [self.weekend_penalty_weight * term for term in weekend_terms]
-        ) if (objective_expr or weekend_terms) else 0
-        if self.fallback_penalty_vars:
-            fallback_expr = cp_model.LinearExpr.Sum(self.fallback_penalty_vars)
-            objective_sum = objective_sum + self.fallback_penalty_weight * fallback_expr
-        if self.repeat_penalty_variables:
-            penalty_expr = cp_model.LinearExpr.Sum(self.repeat_penalty_variables)
-            objective_sum = objective_sum + self.repeat_penalty_weight * penalty_expr
-        model.Minimize(objective_sum)
+        self._minimize_with_penalties(model, objective_vars, objective_coeffs, weekend_terms)
+
+    def _minimize_with_penalties(
+        self,
+        model: cp_model.CpModel,
+        objective_vars: List[cp_model.IntVar],
+        objective_coeffs: List[int],
+        weekend_terms: Tuple[Sequence[cp_model.IntVar], int],
+    ) -> None:
+        """Minimize the mode's terms plus the weekend, fallback and repeat penalties.
+
+        Every term is a (var, coefficient) pair, so the objective is one ``WeightedSum``.
+        """
+        weekend_vars, weekend_offset = weekend_terms
+        penalty_groups = (
+            (weekend_vars, self.weekend_penalty_weight),
+            (self.fallback_penalty_vars, self.fallback_penalty_weight),
+            (self.repeat_penalty_variables, self.repeat_penalty_weight),
+        )
+        for penalty_vars, penalty_weight in penalty_groups:
+            objective_vars.extend(penalty_vars)
+            objective_coeffs.extend([penalty_weight] * len(penalty_vars))
+        model.Minimize(
+            cp_model.LinearExpr.WeightedSum(objective_vars, objective_coeffs)
+            + self.weekend_penalty_weight * weekend_offset
+        )
 
     def _build_weekend_fairness_terms(
         self,
         model: cp_model.CpModel,
         weekend_vars: Sequence[cp_model.IntVar],
-    ) -> List[cp_model.IntVar]:
-        """Generate absolute deviation terms for weekend fairness balancing."""
+    ) -> Tuple[List[cp_model.IntVar], int]:
+        """Return the weekend fairness terms of ``model``, building them at most once."""
+        cached = self._weekend_terms_cache
+        if cached is not None and cached[0] is model:
+            return cached[1]
+        terms = self._create_weekend_fairness_terms(model, weekend_vars)
+        self._weekend_terms_cache = (model, terms)
+        return terms
+
+    def _create_weekend_fairness_terms(
+        self,
+        model: cp_model.CpModel,
+        weekend_vars: Sequence[cp_model.IntVar],
+    ) -> Tuple[List[cp_model.IntVar], int]:
+        """Generate absolute deviation terms for weekend fairness balancing.
+
+        Returns the deviation vars plus the constant deviation of people who cannot take
+        any weekend slot, which needs no variable.
+        """
         if not self.weekend_slot_indices or not weekend_vars:
-            return []
+            return [], 0
         num_people = len(self.people)
-        if num_people == 0:
-            return []
+        if num_people <= 1:
+            # A lone person takes every weekend slot, so the deviation is always zero.
+            return [], 0
         weekend_slots = self.weekend_slot_count
         total_history = sum(
             self.weekend_history_counts.get(person.identifier, 0)
@@ -778,27 +956,41 @@ class SchedulingPrototype:
         )
         total_final = total_history + weekend_slots
         if total_final == 0:
-            return []
+            return [], 0
         scaled_bound = total_final * max(1, num_people)
         terms: List[cp_model.IntVar] = []
+        fixed_deviation = 0
         for p_idx, person in enumerate(self.people):
             history_count = self.weekend_history_counts.get(person.identifier, 0)
+            if not self.person_weekend_vars[p_idx]:
+                fixed_deviation += abs(history_count * num_people - total_final)
+                continue
             weekend_var = weekend_vars[p_idx]
-            diff = model.NewIntVar(-scaled_bound, scaled_bound, f"weekend_diff_p{p_idx}")
-            model.Add(diff == (history_count + weekend_var) * num_people - total_final)
             abs_diff = model.NewIntVar(0, scaled_bound, f"weekend_abs_p{p_idx}")
-            model.AddAbsEquality(abs_diff, diff)
+            model.AddAbsEquality(abs_diff, weekend_var * num_people + (history_count * num_people - total_final))
             terms.append(abs_diff)
-        return terms
+        return terms, fixed_deviation
 
-    def solve(self) -> cp_model.CpSolver:
-        """Builds the full model and returns the configured solver after solving."""
+    def solve(self, max_time_s: float = SOLVER_TIME_LIMIT_SECONDS) -> cp_model.CpSolver:
+        """Builds the full model and returns the configured solver after solving.
+
+        The solver runs one portfolio worker per available core (capped at
+        ``SOLVER_MAX_WORKERS``); ``solver.ResponseStats()`` on the result gives the search summary.
+        """
         model = cp_model.CpModel()
-        assignment_vars = self._build_assignment_variables(model)
+        # Per-model accumulators start empty, so a re-solve never mixes in stale terms.
+        self.repeat_penalty_variables = []
+        self.fallback_penalty_vars = []
+        self._weekend_terms_cache = None
+        rotation_blocks = self._collect_clinic_rotation_blocks()
+        assignment_vars = self._build_assignment_variables(
+            model, self._rotation_slot_aliases(rotation_blocks)
+        )
         self._enforce_slot_coverage(model, assignment_vars)
-        self._enforce_clinic_rotation_and_seniority(model, assignment_vars)
+        self._enforce_clinic_rotation_and_seniority(model, assignment_vars, rotation_blocks)
         self._enforce_duty_seniority_rules(model, assignment_vars)
-        self._enforce_non_overlap_and_rest(model, assignment_vars)
+        conflict_cliques = self._compute_conflict_cliques()
+        self._enforce_non_overlap_and_rest(model, assignment_vars, conflict_cliques)
         self._enforce_person_limits(model, assignment_vars)
         load_vars, hour_vars, weekend_vars, total_slots, total_hours = self._build_person_totals(model, assignment_vars)
         if self.objective_mode == "balanced":
@@ -812,10 +1004,16 @@ class SchedulingPrototype:
             )
         else:
             self._add_seniority_objective(model, load_vars, weekend_vars, total_slots)
+        self._add_greedy_hint(model, conflict_cliques)
 
         solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = 10
-        solver.parameters.num_search_workers = 8
+        solver.parameters.max_time_in_seconds = max_time_s
+        solver.parameters.num_workers = max(1, min(SOLVER_MAX_WORKERS, os.cpu_count() or 1))
+        solver.parameters.log_search_progress = False
+        # LP relaxation of the abs-deviation objectives; lets seniority runs prove optimality.
+        solver.parameters.linearization_level = 2
+        # The greedy hint ignores seniority rules; let CP-SAT repair it instead of dropping it.
+        solver.parameters.repair_hint = True
 
         status = solver.Solve(model)
         if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
@@ -824,24 +1022,35 @@ class SchedulingPrototype:
         self.assignment_vars = assignment_vars  # type: ignore[assignment]
         self.solver = solver  # type: ignore[assignment]
         self.solve_status = status  # type: ignore[assignment]
+        self._slot_owners: Optional[List[Optional[int]]] = None
         return solver
 
-    def _require_solution(self) -> Tuple[cp_model.CpSolver, Dict[Tuple[int, int], cp_model.IntVar]]:
+    def _require_solution(self) -> List[Optional[int]]:
+        """Return the assigned person index per slot (None if unassigned).
+
+        The solver values are read once per solve, walking only each slot's candidates,
+        and shared by all result accessors.
+        """
         if not hasattr(self, "solver") or not hasattr(self, "assignment_vars"):
             raise RuntimeError("Solve the model before requesting results.")
-        return self.solver, self.assignment_vars  # type: ignore[attr-defined]
+        if self._slot_owners is None:
+            solver = self.solver  # type: ignore[attr-defined]
+            slot_owners: List[Optional[int]] = []
+            for entries in self.slot_person_entries:
+                owner: Optional[int] = None
+                for p_idx, var, _seniority, _is_assistant in entries:
+                    if solver.BooleanValue(var):
+                        owner = p_idx
+                        break
+                slot_owners.append(owner)
+            self._slot_owners = slot_owners
+        return self._slot_owners
 
     def get_assignments(self) -> List[Dict[str, Any]]:
-        solver, assignment_vars = self._require_solution()
+        slot_owners = self._require_solution()
         assignments: List[Dict[str, Any]] = []
-        for s_idx, slot in enumerate(self.slots):
-            assigned_person: Person | None = None
-            for p_idx, person in enumerate(self.people):
-                var = assignment_vars.get((p_idx, s_idx))
-                if var is not None and solver.BooleanValue(var):
-                    assigned_person = person
-                    break
-
+        for slot, owner in zip(self.slots, slot_owners):
+            assigned_person: Person | None = self.people[owner] if owner is not None else None
             assignments.append(
                 {
                     "slot_id": slot.identifier,
@@ -859,21 +1068,24 @@ class SchedulingPrototype:
         return assignments
 
     def get_person_loads(self) -> List[Dict[str, Any]]:
-        solver, assignment_vars = self._require_solution()
+        slot_owners = self._require_solution()
         loads: List[Dict[str, Any]] = []
-        total_slots = len(self.slots)
-        slot_hours = [int(slot.duration_hours) for slot in self.slots]
+        slot_hours = self._slot_durations
+        slot_is_weekend = self._slot_is_weekend
+        assigned_counts = [0] * len(self.people)
+        assigned_hours = [0] * len(self.people)
+        weekend_counts = [0] * len(self.people)
+        for s_idx, owner in enumerate(slot_owners):
+            if owner is None:
+                continue
+            assigned_counts[owner] += 1
+            assigned_hours[owner] += slot_hours[s_idx]
+            if slot_is_weekend[s_idx]:
+                weekend_counts[owner] += 1
         for p_idx, person in enumerate(self.people):
-            load = 0
-            total_hours = 0
-            weekend_count = 0
-            for s_idx in range(total_slots):
-                var = assignment_vars.get((p_idx, s_idx))
-                if var is not None and solver.BooleanValue(var):
-                    load += 1
-                    total_hours += slot_hours[s_idx]
-                    if s_idx in self.weekend_slot_indices:
-                        weekend_count += 1
+            load = assigned_counts[p_idx]
+            total_hours = assigned_hours[p_idx]
+            weekend_count = weekend_counts[p_idx]
             target = person.preferred_load()
             loads.append(
                 {
@@ -894,17 +1106,12 @@ class SchedulingPrototype:
         return loads
 
     def format_solution(self) -> str:
-        solver, assignment_vars = self._require_solution()
+        slot_owners = self._require_solution()
 
         lines: List[str] = ["=== Schedule ==="]
-        for s_idx, slot in enumerate(self.slots):
+        for slot, owner in zip(self.slots, slot_owners):
             slot_label = slot.label or slot.identifier
-            assigned_person = None
-            for p_idx, person in enumerate(self.people):
-                var = assignment_vars.get((p_idx, s_idx))
-                if var is not None and solver.BooleanValue(var):
-                    assigned_person = person
-                    break
+            assigned_person = self.people[owner] if owner is not None else None
             if assigned_person is None:
                 lines.append(f"- {slot.identifier} ({slot_label}): unassigned")
             else:
@@ -972,21 +1179,34 @@ def build_demo_slots() -> List[DutySlot]:
     ]
 
 
+def _record_getter(row: Any) -> Callable[[str], Any]:
+    """Return a ``get(key)`` for a record without copying it into a new dict.
+
+    Mappings expose ``get`` directly; ``sqlite3.Row`` only supports indexing, so missing
+    keys are mapped to None like ``dict.get`` would.
+    """
+    getter = getattr(row, "get", None)
+    if getter is not None:
+        return getter
+    keys = frozenset(row.keys())
+    return lambda key: row[key] if key in keys else None
+
+
 def people_from_records(records: Sequence[Mapping[str, Any]]) -> List[Person]:
     """Transform DB staff records into Person instances."""
     people: List[Person] = []
     for row in records:
-        row_dict = dict(row)
-        title = (row_dict.get("title") or "").strip()
-        raw_seniority = (row_dict.get("seniority") or "").strip().lower()
+        get = _record_getter(row)
+        title = (get("title") or "").strip()
+        raw_seniority = (get("seniority") or "").strip().lower()
         if title == "Uzm. Dr.":
             seniority_key = "uzman"
         else:
             seniority_key = raw_seniority if raw_seniority in SENIORITY_LEVELS else "ara"
-        identifier = f"staff_{row_dict.get('id')}"
-        display_name = str(row_dict.get("name") or "Bilinmeyen")
-        raw_min = row_dict.get("min_night_duties_per_month")
-        raw_max = row_dict.get("max_night_duties_per_month")
+        identifier = f"staff_{get('id')}"
+        display_name = str(get("name") or "Bilinmeyen")
+        raw_min = get("min_night_duties_per_month")
+        raw_max = get("max_night_duties_per_month")
         try:
             min_limit = int(raw_min) if raw_min is not None else None
         except (TypeError, ValueError):
@@ -1001,12 +1221,12 @@ def people_from_records(records: Sequence[Mapping[str, Any]]) -> List[Person]:
             max_limit = None
         if min_limit is not None and max_limit is not None and min_limit > max_limit:
             min_limit, max_limit = None, None
-        education_raw = row_dict.get("education_year")
+        education_raw = get("education_year")
         try:
             education_year = int(education_raw) if education_raw is not None else None
         except (TypeError, ValueError):
             education_year = None
-        night_raw = row_dict.get("night_duty_exempt")
+        night_raw = get("night_duty_exempt")
         try:
             night_flag = bool(int(night_raw))
         except (TypeError, ValueError):
@@ -1026,6 +1246,25 @@ def people_from_records(records: Sequence[Mapping[str, Any]]) -> List[Person]:
     return people
 
 
+@functools.lru_cache(maxsize=32)
+def _position_suffixes(count: int) -> Tuple[Tuple[str, str], ...]:
+    """(identifier suffix, label suffix) per staffed position; single seats get none."""
+    if count <= 1:
+        return (("", ""),)
+    return tuple((f"_{idx}", f" #{idx}") for idx in range(1, count + 1))
+
+
+@functools.lru_cache(maxsize=8)
+def _turkish_holidays(year: int) -> FrozenSet[dt.date]:
+    """Turkish public holidays of ``year``, built once per year and shared across calls."""
+    try:
+        calendar_obj = holidays.Turkey(years=[year])
+    except TypeError:  # pragma: no cover - API compatibility
+        calendar_obj = holidays.Turkey()
+        dt.date(year, 1, 1) in calendar_obj  # older APIs populate a year on first lookup
+    return frozenset(day for day in calendar_obj if day.year == year)
+
+
 def slots_from_records(
     clinics: Sequence[Mapping[str, Any]],
     duty_types: Sequence[Mapping[str, Any]],
@@ -1041,11 +1280,9 @@ def slots_from_records(
 
     if year is None or month is None:
         if period_start is not None:
-            base_day = period_start
-            month_days = [base_day + dt.timedelta(days=offset) for offset in range(7)]
-            reference_day = month_days[0]
-            year = reference_day.year
-            month = reference_day.month
+            # The whole month containing period_start is generated below.
+            year = period_start.year
+            month = period_start.month
         else:
             today = dt.date.today()
             year = year or today.year
@@ -1058,44 +1295,45 @@ def slots_from_records(
     first_day = dt.date(year, month, 1)
     month_days = [first_day + dt.timedelta(days=offset) for offset in range(days_in_month)]
 
-    holiday_calendar = None
-    if HOLIDAYS_AVAILABLE:
-        try:
-            holiday_calendar = holidays.Turkey(years=[year])
-        except TypeError:  # pragma: no cover - API compatibility
-            holiday_calendar = holidays.Turkey()
+    holiday_calendar = _turkish_holidays(year) if HOLIDAYS_AVAILABLE else None
+
+    # Per-day facts are resolved once and shared by every clinic and duty type below.
+    day_keys = [day.isoformat() for day in month_days]
+    day_midnights = [dt.datetime.combine(day, dt.time.min) for day in month_days]
+    workday_indices = [
+        d_idx
+        for d_idx, day in enumerate(month_days)
+        if day.weekday() < 5 and not (holiday_calendar is not None and day in holiday_calendar)
+    ]
+    all_day_indices = range(len(month_days))
+    clinic_start_offset = dt.timedelta(hours=8)
 
     include_clinic_slots = normalized_plan != "nobet"
 
     if include_clinic_slots:
         for clinic_row in clinics:
-            clinic = dict(clinic_row)
-            clinic_id = clinic.get('id')
-            clinic_name = clinic.get('name') or 'Klinik'
-            responsible_name = clinic.get('responsible_name')
+            get = _record_getter(clinic_row)
+            clinic_id = get('id')
+            clinic_name = get('name') or 'Klinik'
+            responsible_name = get('responsible_name')
             if responsible_name:
                 clinic_display_name = f"{clinic_name} (Sorumlu: {responsible_name})"
             else:
                 clinic_display_name = clinic_name
-            raw_required = clinic.get('required_assistants')
+            raw_required = get('required_assistants')
             try:
                 required_assistants = int(raw_required)
             except (TypeError, ValueError):
                 required_assistants = 1
             required_assistants = max(required_assistants, 1)
 
-            for day in month_days:
-                is_weekend = day.weekday() >= 5
-                is_holiday = holiday_calendar is not None and day in holiday_calendar
-                if is_weekend or is_holiday:
-                    continue
-                start_dt = dt.datetime.combine(day, dt.time(8, 0))
-                for idx in range(required_assistants):
-                    suffix = f"_{idx + 1}" if required_assistants > 1 else ""
-                    identifier = f"clinic_{clinic_id}_{day.isoformat()}{suffix}"
-                    label = f"{clinic_display_name} - {day.strftime('%Y-%m-%d')}"
-                    if required_assistants > 1:
-                        label = f"{label} #{idx + 1}"
+            position_suffixes = _position_suffixes(required_assistants)
+            for d_idx in workday_indices:
+                day_key = day_keys[d_idx]
+                start_dt = day_midnights[d_idx] + clinic_start_offset
+                for id_suffix, label_suffix in position_suffixes:
+                    identifier = f"clinic_{clinic_id}_{day_key}{id_suffix}"
+                    label = f"{clinic_display_name} - {day_key}{label_suffix}"
                     slots.append(
                         DutySlot(
                             identifier=identifier,
@@ -1107,15 +1345,15 @@ def slots_from_records(
                     )
 
     for duty_row in duty_types:
-        duty = dict(duty_row)
-        duty_id = duty.get('id')
-        duty_name = duty.get('name') or 'Nobet'
-        duty_category = (duty.get('duty_category') or 'nobet').strip().lower()
+        get = _record_getter(duty_row)
+        duty_id = get('id')
+        duty_name = get('name') or 'Nobet'
+        duty_category = (get('duty_category') or 'nobet').strip().lower()
         if normalized_plan == "clinic" and duty_category != "mesa":
             continue
         if normalized_plan == "nobet" and duty_category != "nobet":
             continue
-        raw_duration = duty.get('duration_hours') or 0
+        raw_duration = get('duration_hours') or 0
         try:
             duration = int(raw_duration)
         except (TypeError, ValueError):
@@ -1125,25 +1363,21 @@ def slots_from_records(
             start_hour = (8 - duration) % 24  # aim to finish around 08:00 next day
         else:
             start_hour = 8
-        raw_required_staff = duty.get('required_staff_count')
+        raw_required_staff = get('required_staff_count')
         try:
             required_staff = int(raw_required_staff)
         except (TypeError, ValueError):
             required_staff = 1
         required_staff = max(required_staff, 1)
 
-        for day in month_days:
-            is_weekend = day.weekday() >= 5
-            is_holiday = holiday_calendar is not None and day in holiday_calendar
-            if duty_category == "mesa" and (is_weekend or is_holiday):
-                continue
-            start_dt = dt.datetime.combine(day, dt.time(start_hour, 0))
-            for idx in range(required_staff):
-                suffix = f"_{idx + 1}" if required_staff > 1 else ""
-                identifier = f"duty_{duty_id}_{day.isoformat()}{suffix}"
-                label = f"{duty_name} - {day.strftime('%Y-%m-%d')}"
-                if required_staff > 1:
-                    label = f"{label} #{idx + 1}"
+        start_offset = dt.timedelta(hours=start_hour)
+        position_suffixes = _position_suffixes(required_staff)
+        for d_idx in workday_indices if duty_category == "mesa" else all_day_indices:
+            day_key = day_keys[d_idx]
+            start_dt = day_midnights[d_idx] + start_offset
+            for id_suffix, label_suffix in position_suffixes:
+                identifier = f"duty_{duty_id}_{day_key}{id_suffix}"
+                label = f"{duty_name} - {day_key}{label_suffix}"
                 slots.append(
                     DutySlot(
                         identifier=identifier,
@@ -1173,8 +1407,13 @@ def solve_schedule(
     weekend_history_counts: Optional[Mapping[str, int]] = None,
     staff_leave_requests: Optional[Mapping[int, Sequence[Tuple[dt.date, dt.date]]]] = None,
     objective_mode: str = "seniority",
+    previous_solution: Optional[Mapping[str, str]] = None,
 ) -> Dict[str, Any]:
-    """Solve scheduling for arbitrary people and slots."""
+    """Solve scheduling for arbitrary people and slots.
+
+    ``previous_solution`` (slot id -> person id, e.g. from an earlier result's assignments)
+    warm-starts a re-solve after small edits; leave it out for a cold start.
+    """
     if duty_seniority_rules is None and duty_senorty_rules is not None:
         duty_seniority_rules = duty_senorty_rules
 
@@ -1253,6 +1492,7 @@ def solve_schedule(
         leave_calendar=leave_calendar,
         weekend_history_counts=weekend_history_by_identifier,
         objective_mode=objective_mode,
+        previous_solution=previous_solution,
     )
     solver = prototype.solve()
 